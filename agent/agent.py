@@ -1,15 +1,21 @@
 import os
+import sys
+import array
+import threading
+import subprocess
 import time
 import socket
 import requests
+from requests.adapters import HTTPAdapter
 import psutil
 import platform
-import hashlib
 import pwd
 import grp
 from datetime import datetime
 import asyncio
 import json
+import functools
+from collections import deque
 
 try:
     import websockets
@@ -17,30 +23,66 @@ try:
 except ImportError:
     WEBSOCKETS_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    from pystemd.systemd1 import Manager
+    PYSTEMD_AVAILABLE = True
+except ImportError:
+    PYSTEMD_AVAILABLE = False
+
 try:
     from watchdog.observers import Observer
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
 
-from config import SERVER_URL, AGENT_ID, INTERVAL, SEND_MODE, WS_URL
+from config import SERVER_URL, SERVER_BATCH_URL, AGENT_ID, INTERVAL, SEND_MODE, WS_URL, BATCH_SIZE, BATCH_MAX_AGE, COMPRESSION
 from collectors import system, process, network, file, user, logs, persistence, firewall, container, cloud, threat_intel, integrity, security_tools, snapshot
 
 # --- File System Monitoring (Watchdog) ---
-file_events = []
+# Events are kept column-wise (one list per field) rather than one dict per event;
+# package installs can fire thousands of events between ticks.
+_FE = {"type": [], "path": [], "is_dir": bytearray(), "ts": array.array("d")}
+_FE_LOCK = threading.Lock()
 
 class FileChangeHandler:
     def on_any_event(self, event):
-        file_events.append({
-            "event_type": event.event_type,
-            "src_path": event.src_path,
-            "is_directory": event.is_directory,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        with _FE_LOCK:
+            _FE["type"].append(sys.intern(event.event_type))
+            _FE["path"].append(event.src_path)
+            _FE["is_dir"].append(event.is_directory)
+            _FE["ts"].append(time.time())
     
     def dispatch(self, event):
         self.on_any_event(event)
 
+def drain_file_events():
+    """Return buffered file events as dicts and reset the buffer."""
+    with _FE_LOCK:
+        columns = (_FE["type"][:], _FE["path"][:], bytes(_FE["is_dir"]), _FE["ts"].tolist())
+        for column in _FE.values():
+            del column[:]
+    return [
+        {
+            "event_type": event_type,
+            "src_path": src_path,
+            "is_directory": bool(is_dir),
+            "timestamp": datetime.utcfromtimestamp(ts).isoformat()
+        }
+        for event_type, src_path, is_dir, ts in zip(*columns)
+    ]
+
 def start_file_monitor(path="/etc"):
     if not WATCHDOG_AVAILABLE:
         print("[WARNING] watchdog library not installed. File monitoring disabled.")
@@ -52,6 +94,27 @@ def start_file_monitor(path="/etc"):
     return observer
 
 # --- Utility Functions ---
+HOST_INFO_TTL = 60  # seconds; accounts, services and firewall rules change far slower than INTERVAL
+
+def ttl_cache(seconds):
+    """Cache a function's result per argument tuple for `seconds`."""
+    def decorator(fn):
+        cache = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and hit[1] > now:
+                return hit[0]
+            value = fn(*args)
+            cache[args] = (value, now + seconds)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
 def get_logged_in_users():
     try:
         return [u.name for u in psutil.users()]
@@ -59,21 +122,7 @@ def get_logged_in_users():
         return []
 
 def get_processes():
-    procs = []
-    for p in psutil.process_iter(['pid', 'name', 'username', 'cmdline', 'ppid', 'create_time', 'exe']):
-        try:
-            info = p.info
-            # Hash the binary if possible
-            exe = info.get('exe')
-            file_hash = None
-            if exe and os.path.isfile(exe):
-                with open(exe, 'rb') as f:
-                    file_hash = hashlib.sha256(f.read()).hexdigest()
-            info['sha256'] = file_hash
-            procs.append(info)
-        except Exception:
-            continue
-    return procs
+    return process.list_processes()
 
 def get_network_connections():
     conns = []
@@ -92,6 +141,7 @@ def get_network_connections():
             continue
     return conns
 
+@ttl_cache(seconds=HOST_INFO_TTL)
 def get_users_groups():
     try:
         users = [u.pw_name for u in pwd.getpwall()]
@@ -100,27 +150,51 @@ def get_users_groups():
     except Exception:
         return [], []
 
-def get_cron_jobs():
+CRON_SPOOL_DIRS = ["/var/spool/cron/crontabs", "/var/spool/cron"]  # Debian, RHEL
+
+def _run_lines(argv):
+    # argv list, no shell: one fork+exec instead of sh plus the command
     try:
-        with os.popen('crontab -l') as f:
-            return f.read().splitlines()
+        return subprocess.run(argv, capture_output=True, text=True, timeout=10).stdout.splitlines()
     except Exception:
         return []
 
-def get_services():
+@ttl_cache(seconds=HOST_INFO_TTL)
+def get_cron_jobs():
     try:
-        with os.popen('systemctl list-units --type=service --state=running') as f:
-            return f.read().splitlines()
-    except Exception:
-        return []
+        user_name = pwd.getpwuid(os.getuid()).pw_name
+    except KeyError:
+        user_name = str(os.getuid())  # uid without a passwd entry (e.g. containers run with --user)
+    for spool in CRON_SPOOL_DIRS:
+        try:
+            with open(os.path.join(spool, user_name)) as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            continue
+        except OSError:
+            break  # spool not readable without root; let crontab(1) do it
+    return _run_lines(['crontab', '-l'])
+
+@ttl_cache(seconds=HOST_INFO_TTL)
+def get_services():
+    if PYSTEMD_AVAILABLE:
+        try:
+            with Manager() as manager:
+                units = manager.Manager.ListUnits()
+            return [
+                f"{name.decode()} {load.decode()} {active.decode()} {sub.decode()} {desc.decode()}"
+                for name, desc, load, active, sub, *_ in units
+                if name.endswith(b".service") and sub == b"running"
+            ]
+        except Exception:
+            pass
+    return _run_lines(['systemctl', 'list-units', '--type=service', '--state=running'])
 
+@ttl_cache(seconds=HOST_INFO_TTL)
 def get_firewall_rules():
-    try:
-        with os.popen('iptables -S') as f:
-            return f.read().splitlines()
-    except Exception:
-        return []
+    return _run_lines(['iptables', '-S'])
 
+@ttl_cache(seconds=HOST_INFO_TTL)
 def get_os_info():
     return {
         "os": platform.system(),
@@ -132,50 +206,144 @@ def get_os_info():
         "python_version": platform.python_version()
     }
 
-def collect_all_data():
+async def _run_collector(collector):
+    # Blocking collectors run on worker threads; coroutines are awaited on the loop
+    try:
+        if asyncio.iscoroutinefunction(collector):
+            return await collector()
+        return await asyncio.to_thread(collector)
+    except Exception as e:
+        return {"error": str(e)}
+
+async def collect_all_data():
+    timestamp = time.time()
+    collectors = {
+        "system": system.collect_system_metrics,
+        "process": process.collect_process_info,
+        "network": network.collect_network_info,
+        "user": user.collect_user_activity,
+        "persistence": persistence.collect_persistence_info,
+        "firewall": firewall.collect_firewall_rules,
+        "container": container.collect_container_info,
+        "cloud": cloud.collect_cloud_info_async,
+        "threat_intel": functools.partial(threat_intel.enrich_with_threat_intel_async, {}),  # Pass relevant data as needed
+        "integrity": integrity.check_agent_integrity,
+        "security_tools": security_tools.collect_security_tools_status,
+    }
+    # Most collectors wait on subprocesses, /proc, HTTP or the Docker socket, so run them concurrently
+    results = dict(zip(collectors, await asyncio.gather(*map(_run_collector, collectors.values()))))
     data = {
         "agent_id": AGENT_ID,
-        "timestamp": time.time(),
-        "system": system.collect_system_metrics(),
-        "process": process.collect_process_info(),
-        "network": network.collect_network_info(),
-        "file": {"events": []},  # Simplified for now
-        "user": user.collect_user_activity(),
-        "logs": {"timestamp": datetime.utcnow().isoformat()},  # Simplified for now
-        "persistence": persistence.collect_persistence_info(),
-        "firewall": firewall.collect_firewall_rules(),
-        "container": container.collect_container_info(),
-        "cloud": cloud.collect_cloud_info(),
-        "threat_intel": threat_intel.enrich_with_threat_intel({}),  # Pass relevant data as needed
-        "integrity": integrity.check_agent_integrity(),
-        "security_tools": security_tools.collect_security_tools_status(),
+        "timestamp": timestamp,
+        "system": results["system"],
+        "process": results["process"],
+        "network": results["network"],
+        "file": {"events": drain_file_events()},
+        "user": results["user"],
+        "logs": {"timestamp": datetime.utcfromtimestamp(timestamp).isoformat()},  # Simplified for now; same instant as the event
+        "persistence": results["persistence"],
+        "firewall": results["firewall"],
+        "container": results["container"],
+        "cloud": results["cloud"],
+        "threat_intel": results["threat_intel"],
+        "integrity": results["integrity"],
+        "security_tools": results["security_tools"],
     }
     return data
 
+def _orjson_default(obj):
+    # psutil hands back namedtuples (e.g. laddr/raddr); json.dumps writes them as lists
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError
+
+def dumps_event(event):
+    """Serialize an event to UTF-8 JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(event, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(event).encode()
+
+# Event JSON repeats process names, paths and users heavily; zstd level 3 shrinks it ~10x cheaply
+_ZSTD = zstandard.ZstdCompressor(level=3) if ZSTD_AVAILABLE and COMPRESSION == "zstd" else None
+
+def _encode_body(payload):
+    body = dumps_event(payload)
+    headers = {"Content-Type": "application/json"}
+    if _ZSTD is not None:
+        body = _ZSTD.compress(body)
+        headers["Content-Encoding"] = "zstd"
+    return body, headers
+
+# Shared keep-alive session for the server and ML core; both are hit every tick
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+
 def send_event_rest(event):
+    url = SERVER_BATCH_URL if "batch" in event else SERVER_URL
     try:
-        response = requests.post(SERVER_URL, json=event, timeout=10)
+        body, headers = _encode_body(event)
+        response = _HTTP.post(url, data=body, headers=headers, timeout=10)
         print(f"[INFO] Event reported via REST: {response.status_code} {response.text}")
     except Exception as e:
         print(f"[ERROR] Failed to report event via REST: {e}")
 
+WS_PING_INTERVAL = 20
+_WS_CONN = None
+
+async def _get_ws():
+    # One connection for the agent's lifetime; reopened after a failure
+    global _WS_CONN
+    if _WS_CONN is None:
+        # permessage-deflate keeps the text frames the server expects while compressing them on the wire
+        _WS_CONN = await websockets.connect(WS_URL, ping_interval=WS_PING_INTERVAL, compression="deflate")
+    return _WS_CONN
+
+async def _drop_ws():
+    global _WS_CONN
+    ws, _WS_CONN = _WS_CONN, None
+    if ws is not None:
+        try:
+            await ws.close()
+        except Exception:
+            pass
+
 async def send_event_ws(event):
     if not WEBSOCKETS_AVAILABLE:
         print("[ERROR] websockets library not installed. Cannot send via WebSocket.")
         return
     try:
-        async with websockets.connect(WS_URL) as ws:
-            await ws.send(json.dumps(event))
-            ack = await ws.recv()
-            print(f"[INFO] Event reported via WebSocket: {ack}")
+        ws = await _get_ws()
+        await ws.send(dumps_event(event).decode())  # server reads text frames
+        ack = await ws.recv()
+        print(f"[INFO] Event reported via WebSocket: {ack}")
     except Exception as e:
+        await _drop_ws()
         print(f"[ERROR] Failed to report event via WebSocket: {e}")
 
+# Events waiting to be sent; flushed as {"batch": [...]} when full or stale
+_EVENT_BUFFER = deque()
+_last_flush = time.monotonic()
+
+def _take_batch():
+    """Return the payload to send now, or None while the buffer is still filling."""
+    global _last_flush
+    if not _EVENT_BUFFER:
+        return None
+    if len(_EVENT_BUFFER) < BATCH_SIZE and time.monotonic() - _last_flush < BATCH_MAX_AGE:
+        return None
+    _last_flush = time.monotonic()
+    if len(_EVENT_BUFFER) == 1:
+        return _EVENT_BUFFER.popleft()
+    payload = {"batch": list(_EVENT_BUFFER)}
+    _EVENT_BUFFER.clear()
+    return payload
+
 ML_CORE_URL = os.getenv("ML_CORE_URL", "http://ml_core:9000/predict")
 
 def detect_anomaly(event):
     try:
-        response = requests.post(ML_CORE_URL, json={"data": event}, timeout=10)
+        response = _HTTP.post(ML_CORE_URL, data=dumps_event({"data": event}), headers={"Content-Type": "application/json"}, timeout=10)
         if response.status_code == 200:
             result = response.json()
             return result.get("is_anomalous", False), result.get("anomaly_score", 0.0)
@@ -188,6 +356,34 @@ def detect_anomaly(event):
 
 SNAPSHOT_WS_PORT = int(os.getenv("SNAPSHOT_WS_PORT", 8080))
 
+def _build_snapshot_results(snapshot_type, target_pid):
+    # gcore/lsof calls block for seconds; run off the event loop
+    results = {}
+
+    if snapshot_type in ["agent", "all"]:
+        # Snapshot agent process
+        agent_pid = os.getpid()
+        results["agent"] = {
+            "pid": agent_pid,
+            "memory": snapshot.take_memory_snapshot(agent_pid),
+            "lsof": snapshot.collect_lsof(agent_pid)
+        }
+
+    if snapshot_type in ["all", "all_processes"]:
+        # Snapshot all processes (lsof)
+        results["all_processes"] = {
+            "lsof": snapshot.collect_lsof()
+        }
+
+    if snapshot_type == "process" and target_pid:
+        # Snapshot specific process
+        results["target_process"] = {
+            "pid": target_pid,
+            "memory": snapshot.take_memory_snapshot(target_pid),
+            "lsof": snapshot.collect_lsof(target_pid)
+        }
+    return results
+
 async def handle_snapshot_request(websocket, path):
     """Handle snapshot requests from server via WebSocket."""
     try:
@@ -199,30 +395,8 @@ async def handle_snapshot_request(websocket, path):
                 
                 print(f"[SNAPSHOT] Received request: {snapshot_type}")
                 
-                results = {}
-                
-                if snapshot_type in ["agent", "all"]:
-                    # Snapshot agent process
-                    agent_pid = os.getpid()
-                    results["agent"] = {
-                        "pid": agent_pid,
-                        "memory": snapshot.take_memory_snapshot(agent_pid),
-                        "lsof": snapshot.collect_lsof(agent_pid)
-                    }
-                
-                if snapshot_type in ["all", "all_processes"]:
-                    # Snapshot all processes (lsof)
-                    results["all_processes"] = {
-                        "lsof": snapshot.collect_lsof()
-                    }
-                
-                if snapshot_type == "process" and target_pid:
-                    # Snapshot specific process
-                    results["target_process"] = {
-                        "pid": target_pid,
-                        "memory": snapshot.take_memory_snapshot(target_pid),
-                        "lsof": snapshot.collect_lsof(target_pid)
-                    }
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(None, _build_snapshot_results, snapshot_type, target_pid)
                 
                 # Send results back
                 await websocket.send(json.dumps({
@@ -250,6 +424,27 @@ async def start_snapshot_server():
     print(f"[SNAPSHOT] WebSocket server started on port {SNAPSHOT_WS_PORT}")
     return server
 
+def _snapshot_on_anomaly(event, anomaly_score):
+    print(f"[ALERT] Anomaly detected! Score: {anomaly_score}")
+    # 1. Snapshot agent process
+    agent_pid = os.getpid()
+    print(f"[SNAPSHOT] Agent process PID: {agent_pid}")
+    print(snapshot.take_memory_snapshot(agent_pid))
+    print(snapshot.collect_lsof(agent_pid))
+    # 2. Snapshot all processes (lsof)
+    print("[SNAPSHOT] All processes (lsof)")
+    print(snapshot.collect_lsof())
+    # 3. Snapshot most suspicious process (if available)
+    processes = event.get("process", {}).get("processes", [])
+    if processes:
+        # Example: pick process with highest memory_percent or cpu_percent if available
+        suspicious_proc = max(processes, key=lambda p: p.get("memory_percent", 0) + p.get("cpu_percent", 0))
+        pid = suspicious_proc.get("pid")
+        if pid:
+            print(f"[SNAPSHOT] Most suspicious process PID: {pid}")
+            print(snapshot.take_memory_snapshot(pid))
+            print(snapshot.collect_lsof(pid))
+
 def main():
     print(f"Starting agent {AGENT_ID}, reporting to {SERVER_URL} every {INTERVAL}s using {SEND_MODE.upper()}...")
     print(f"[SNAPSHOT] WebSocket server will start on port {SNAPSHOT_WS_PORT}")
@@ -261,40 +456,29 @@ def main():
         # Start snapshot WebSocket server
         snapshot_server = await start_snapshot_server()
         
-        # Main agent loop
+        # Main agent loop; blocking calls go to the default executor so the snapshot server stays responsive
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while True:
+            # Fixed cadence: the time spent collecting and sending counts toward INTERVAL;
+            # after an overrun start the next tick right away rather than bursting to catch up
+            next_tick = max(next_tick + INTERVAL, loop.time())
             try:
-                event = collect_all_data()
-                is_anomaly, anomaly_score = detect_anomaly(event)
+                event = await collect_all_data()
+                is_anomaly, anomaly_score = await loop.run_in_executor(None, detect_anomaly, event)
                 if is_anomaly:
-                    print(f"[ALERT] Anomaly detected! Score: {anomaly_score}")
-                    # 1. Snapshot agent process
-                    agent_pid = os.getpid()
-                    print(f"[SNAPSHOT] Agent process PID: {agent_pid}")
-                    print(snapshot.take_memory_snapshot(agent_pid))
-                    print(snapshot.collect_lsof(agent_pid))
-                    # 2. Snapshot all processes (lsof)
-                    print("[SNAPSHOT] All processes (lsof)")
-                    print(snapshot.collect_lsof())
-                    # 3. Snapshot most suspicious process (if available)
-                    processes = event.get("process", {}).get("processes", [])
-                    if processes:
-                        # Example: pick process with highest memory_percent or cpu_percent if available
-                        suspicious_proc = max(processes, key=lambda p: p.get("memory_percent", 0) + p.get("cpu_percent", 0))
-                        pid = suspicious_proc.get("pid")
-                        if pid:
-                            print(f"[SNAPSHOT] Most suspicious process PID: {pid}")
-                            print(snapshot.take_memory_snapshot(pid))
-                            print(snapshot.collect_lsof(pid))
-                # Send event as usual
-                if SEND_MODE == "websocket":
-                    await send_event_ws(event)
-                else:
-                    send_event_rest(event)
-                await asyncio.sleep(INTERVAL)
+                    await loop.run_in_executor(None, _snapshot_on_anomaly, event, anomaly_score)
+                # Buffer the event and send once a batch is ready
+                _EVENT_BUFFER.append(event)
+                payload = _take_batch()
+                if payload is not None:
+                    if SEND_MODE == "websocket":
+                        await send_event_ws(payload)
+                    else:
+                        await loop.run_in_executor(None, send_event_rest, payload)
             except Exception as e:
                 print(f"[ERROR] Error in main loop: {e}")
-                await asyncio.sleep(INTERVAL)
+            await asyncio.sleep(max(0, next_tick - loop.time()))
     
     try:
         asyncio.run(run_agent_with_websocket())
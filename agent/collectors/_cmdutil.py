@@ -0,0 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
+CMD_WORKERS = 16
+# Threads only wait on child processes here; keep them separate from the file I/O pool
+CMD_EXECUTOR = ThreadPoolExecutor(max_workers=CMD_WORKERS, thread_name_prefix="cmd")
+
+def run_concurrently(calls):
+    """
+    Run independent collector calls at the same time.
+    `calls` maps result keys to zero-argument callables; returns {key: result} in the same order.
+    The callables must not themselves use run_concurrently.
+    """
+    futures = {key: CMD_EXECUTOR.submit(fn) for key, fn in calls.items()}
+    return {key: future.result() for key, future in futures.items()}
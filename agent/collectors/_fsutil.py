@@ -0,0 +1,121 @@
+import io
+import os
+import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# File reads release the GIL; running them concurrently keeps the disk queue busy
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="fs-io")
+
+def keyword_matcher(keywords):
+    """
+    Return a predicate equivalent to any(kw in s.lower() for kw in keywords), done as
+    one scan with a precompiled alternation instead of a Python-level loop per keyword.
+    (re.IGNORECASE is measurably slower than lowering the subject first.)
+    """
+    pattern = re.compile('|'.join(re.escape(kw.lower()) for kw in keywords))
+    return lambda s: pattern.search(s.lower()) is not None
+
+def iter_files(roots, name_filter=None):
+    """
+    Yield the path of every non-directory entry under `roots`, like the filenames
+    of os.walk(), using one scandir() per directory and no per-file stat.
+    `name_filter(name)` is checked on the bare name before the path is produced.
+    Symlinked directories are listed but not descended into; unreadable
+    directories are skipped.
+    """
+    stack = [roots] if isinstance(roots, str) else list(roots)
+    stack.reverse()
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                try:
+                    # d_type from getdents64 answers this without a stat for regular entries
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif name_filter is None or name_filter(entry.name):
+                    yield entry.path
+        stack.extend(reversed(subdirs))
+
+LOG_EXTENSIONS = (".log", ".err", ".out", ".journal")
+
+def list_log_files(log_dirs, extensions=LOG_EXTENSIONS, path_filter=None):
+    """
+    Return the files in `log_dirs` (not recursive) that glob("*<ext>") would match for
+    any of `extensions` and that pass `path_filter(path)`. Each directory is listed
+    once with scandir and matched in memory, rather than one glob per extension.
+    """
+    extensions = tuple(extensions)
+    paths = []
+    for log_dir in log_dirs:
+        try:
+            it = os.scandir(log_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                # glob's "*" skips dot-files
+                name = entry.name
+                if name.startswith('.') or not name.endswith(extensions):
+                    continue
+                if path_filter is None or path_filter(entry.path):
+                    paths.append(entry.path)
+    return paths
+
+TAIL_BLOCK_SIZE = 1 << 16
+
+def tail_lines(path, n):
+    """
+    Return the last `n` lines of a text file as readlines() would, reading backwards
+    from the end in growing blocks so only the tail is ever loaded.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        end = os.fstat(fd).st_size
+        block = TAIL_BLOCK_SIZE
+        chunks = []
+        newlines = 0
+        # n + 1 newlines guarantee n complete lines after dropping the partial first one
+        while end > 0 and newlines <= n:
+            start = max(0, end - block)
+            data = os.pread(fd, end - start, start)
+            chunks.append(data)
+            newlines += data.count(b'\n')
+            end = start
+            block *= 2
+    finally:
+        os.close(fd)
+    data = b''.join(reversed(chunks))
+    # Cut just after the n-th newline from the end (rfind is a C memrchr), so the bytes
+    # of lines that would be thrown away are never decoded. This also drops the
+    # partial first line when the scan stopped before the start of the file.
+    pos = len(data) - 1 if data.endswith(b'\n') else len(data)
+    for _ in range(n):
+        pos = data.rfind(b'\n', 0, pos)
+        if pos < 0:
+            break
+    if pos >= 0:
+        data = data[pos + 1:]
+    # Same decoding and newline translation as open(path, 'r', errors='ignore')
+    return io.TextIOWrapper(io.BytesIO(data), errors='ignore').readlines()[-n:]
+
+def _read_log_tail(path, max_lines):
+    try:
+        return ''.join(tail_lines(path, max_lines))
+    except Exception as e:
+        return f"error: {e}"
+
+def read_log_tails(paths, max_lines):
+    """Read the last `max_lines` of each log concurrently; returns {path: text or 'error: ...'}."""
+    paths = list(dict.fromkeys(paths))
+    return dict(zip(paths, IO_EXECUTOR.map(functools.partial(_read_log_tail, max_lines=max_lines), paths)))
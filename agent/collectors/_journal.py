@@ -0,0 +1,73 @@
+import re
+import subprocess
+import threading
+
+try:
+    from systemd import journal
+    SYSTEMD_JOURNAL_AVAILABLE = True
+except ImportError:
+    SYSTEMD_JOURNAL_AVAILABLE = False
+
+# Entries a grep'd tail examines before giving up; without a bound a rare pattern walks the whole journal
+GREP_SCAN_LIMIT = 20000
+
+# One sd_journal handle for the agent's lifetime; sd_journal is not thread-safe
+_READER = None
+_READER_LOCK = threading.Lock()
+
+def _reader():
+    global _READER
+    if _READER is None:
+        _READER = journal.Reader()
+        _READER.fileno()  # sets up inotify so process() picks up rotated/new journal files
+    return _READER
+
+def _format_short_iso(entry):
+    # Mirrors journalctl --output short-iso
+    ts = entry.get('__REALTIME_TIMESTAMP')
+    stamp = ts.astimezone().strftime('%Y-%m-%dT%H:%M:%S%z') if ts else ''
+    ident = entry.get('SYSLOG_IDENTIFIER') or entry.get('_COMM') or 'unknown'
+    pid = entry.get('_PID')
+    ident = f"{ident}[{pid}]" if pid else ident
+    return f"{stamp} {entry.get('_HOSTNAME', '')} {ident}: {entry.get('MESSAGE', '')}"
+
+def _read_tail(lines, unit, grep):
+    # journalctl -g uses "smart case": case-insensitive unless the pattern has capitals
+    pattern = re.compile(grep, 0 if grep and grep != grep.lower() else re.IGNORECASE) if grep else None
+    with _READER_LOCK:
+        reader = _reader()
+        reader.process()
+        reader.flush_matches()
+        if unit:
+            reader.add_match(_SYSTEMD_UNIT=unit if '.' in unit else f"{unit}.service")
+        reader.seek_tail()
+        entries = []
+        scanned = 0
+        while len(entries) < lines and scanned < (GREP_SCAN_LIMIT if pattern else lines):
+            entry = reader.get_previous()
+            if not entry:
+                break
+            scanned += 1
+            message = entry.get('MESSAGE', '')
+            if pattern and not pattern.search(message if isinstance(message, str) else str(message)):
+                continue
+            entries.append(entry)
+    return '\n'.join(_format_short_iso(e) for e in reversed(entries)) + ('\n' if entries else '')
+
+def journal_tail(lines=200, unit=None, grep=None):
+    """
+    Last `lines` journal entries in journalctl short-iso text, optionally limited to a
+    unit (-u) or to messages matching a regex (-g). Reads through a persistent
+    sd_journal handle when systemd-python is installed, otherwise runs journalctl;
+    the handle only searches the newest GREP_SCAN_LIMIT entries for grep matches.
+    Raises on failure like subprocess.check_output.
+    """
+    if SYSTEMD_JOURNAL_AVAILABLE:
+        return _read_tail(lines, unit, grep)
+    cmd = ['journalctl']
+    if unit:
+        cmd += ['-u', unit]
+    if grep:
+        cmd += ['-g', grep]
+    cmd += ['-n', str(lines), '--no-pager', '--output', 'short-iso']
+    return subprocess.check_output(cmd, text=True)
@@ -1,8 +1,27 @@
 import os
+import time
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
 METADATA_TIMEOUT = 2  # seconds
+CLOUD_CACHE_TTL = 300  # seconds; instance metadata is static, public IPs can change
+_CLOUD_CACHE = {"ts": 0.0, "data": None}
+
+# One keep-alive pool to the metadata endpoint; no retries so probing still fails fast.
+# The session (and its cookie jar) is shared by all provider probes. trust_env is off so
+# HTTP_PROXY/NO_PROXY never route link-local 169.254.169.254 through a proxy.
+_SESSION = requests.Session()
+_SESSION.trust_env = False
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=0)))
 
 CLOUD_PROVIDERS = {
     "aws": {
@@ -47,21 +66,58 @@ CLOUD_PROVIDERS = {
     }
 }
 
+# Provider never changes once detected; a miss (e.g. metadata endpoint not up yet at boot)
+# is not remembered here and is retried with the next uncached collect_cloud_info().
+_DETECTED_PROVIDER = None
+
 def detect_cloud_provider():
+    global _DETECTED_PROVIDER
+    if _DETECTED_PROVIDER is not None:
+        return _DETECTED_PROVIDER
     for provider, meta in CLOUD_PROVIDERS.items():
         try:
-            r = requests.get(meta["url"], headers=meta.get("headers", {}), timeout=METADATA_TIMEOUT)
+            r = _SESSION.get(meta["url"], headers=meta.get("headers", {}), timeout=METADATA_TIMEOUT)
             if r.status_code == 200:
+                _DETECTED_PROVIDER = provider
                 return provider
         except Exception:
             continue
     return None
 
+def _collect_fields(meta):
+    fields = {}
+    for key, path in meta.get("fields", []):
+        try:
+            url = meta["url"] + path
+            r = _SESSION.get(url, headers=meta.get("headers", {}), timeout=METADATA_TIMEOUT)
+            if r.status_code == 200:
+                fields[key] = r.text.strip()
+        except Exception:
+            fields[key] = None
+    return fields
+
+def _cached_cloud_info():
+    if _CLOUD_CACHE["data"] is not None and time.monotonic() - _CLOUD_CACHE["ts"] < CLOUD_CACHE_TTL:
+        return {"timestamp": datetime.utcnow().isoformat(), "cloud": dict(_CLOUD_CACHE["data"])}
+    return None
+
+def _store_cloud_info(result):
+    _CLOUD_CACHE["data"] = dict(result["cloud"])
+    _CLOUD_CACHE["ts"] = time.monotonic()
+    return result
+
 def collect_cloud_info():
     """
     Detect cloud provider and collect instance metadata (ID, type, region, IP, etc).
+    Results are reused for CLOUD_CACHE_TTL seconds.
     Returns a dict.
     """
+    cached = _cached_cloud_info()
+    if cached is not None:
+        return cached
+    return _store_cloud_info(_fetch_cloud_info())
+
+def _fetch_cloud_info():
     result = {"timestamp": datetime.utcnow().isoformat(), "cloud": {}}
     provider = detect_cloud_provider()
     result["cloud"]["provider"] = provider
@@ -71,19 +127,78 @@ def collect_cloud_info():
     meta = CLOUD_PROVIDERS[provider]
     try:
         if provider == "azure":
-            r = requests.get(meta["url"], headers=meta["headers"], timeout=METADATA_TIMEOUT)
+            r = _SESSION.get(meta["url"], headers=meta["headers"], timeout=METADATA_TIMEOUT)
             if r.status_code == 200:
                 data = r.json()
                 result["cloud"].update(data)
         else:
-            for key, path in meta.get("fields", []):
-                try:
-                    url = meta["url"] + path
-                    r = requests.get(url, headers=meta.get("headers", {}), timeout=METADATA_TIMEOUT)
-                    if r.status_code == 200:
-                        result["cloud"][key] = r.text.strip()
-                except Exception:
-                    result["cloud"][key] = None
+            result["cloud"].update(_collect_fields(meta))
+    except Exception as e:
+        result["cloud"]["error"] = str(e)
+    return result
+
+# Long-lived aiohttp session for the async path, bound to the loop that created it
+_AIO_SESSION = None
+_AIO_SESSION_LOOP = None
+
+def _get_aio_session():
+    global _AIO_SESSION, _AIO_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _AIO_SESSION is None or _AIO_SESSION.closed or _AIO_SESSION_LOOP is not loop:
+        _AIO_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=METADATA_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=8),
+            trust_env=False,
+        )
+        _AIO_SESSION_LOOP = loop
+    return _AIO_SESSION
+
+async def _fetch_field(session, meta, key, path):
+    try:
+        async with session.get(meta["url"] + path, headers=meta.get("headers", {})) as r:
+            if r.status == 200:
+                return {key: (await r.text()).strip()}
+            return {}
+    except Exception:
+        return {key: None}
+
+async def _collect_fields_async(meta):
+    """Fetch every metadata field concurrently over the shared aiohttp session."""
+    session = _get_aio_session()
+    fields = {}
+    for field in await asyncio.gather(
+        *[_fetch_field(session, meta, key, path) for key, path in meta.get("fields", [])]
+    ):
+        fields.update(field)
+    return fields
+
+async def collect_cloud_info_async():
+    """
+    Async variant of collect_cloud_info() for callers already running an event loop.
+    Falls back to the sync collector in a worker thread when aiohttp is missing.
+    """
+    cached = _cached_cloud_info()
+    if cached is not None:
+        return cached
+    if not AIOHTTP_AVAILABLE:
+        return await asyncio.to_thread(collect_cloud_info)
+    return _store_cloud_info(await _fetch_cloud_info_async())
+
+async def _fetch_cloud_info_async():
+    result = {"timestamp": datetime.utcnow().isoformat(), "cloud": {}}
+    provider = await asyncio.to_thread(detect_cloud_provider)
+    result["cloud"]["provider"] = provider
+    if not provider:
+        result["cloud"]["detected"] = False
+        return result
+    meta = CLOUD_PROVIDERS[provider]
+    try:
+        if provider == "azure":
+            async with _get_aio_session().get(meta["url"], headers=meta["headers"]) as r:
+                if r.status == 200:
+                    result["cloud"].update(await r.json(content_type=None))
+        else:
+            result["cloud"].update(await _collect_fields_async(meta))
     except Exception as e:
         result["cloud"]["error"] = str(e)
     return result
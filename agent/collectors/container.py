@@ -1,49 +1,112 @@
 import os
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+CGROUP_ROOT = "/sys/fs/cgroup"
+# Per-container cgroup directories: v2 systemd driver, v2 cgroupfs driver, v1 cpuacct/memory
+CGROUP_V2_DIRS = ["system.slice/docker-{id}.scope", "docker/{id}"]
+CGROUP_V1_CPU = "cpuacct/docker/{id}/cpuacct.usage"
+CGROUP_V1_MEM = "memory/docker/{id}/memory.usage_in_bytes"
+DOCKER_STATS_WORKERS = 10  # docker-py keeps at most 10 pooled connections to dockerd
+
+# Container membership cannot change during the agent's lifetime, so both checks run once
+@functools.lru_cache(maxsize=1)
 def is_docker():
     # Check for /.dockerenv or cgroup
     if os.path.exists('/.dockerenv'):
         return True
     try:
         with open('/proc/1/cgroup', 'rt') as f:
-            return 'docker' in f.read() or 'containerd' in f.read()
+            data = f.read()
+        return 'docker' in data or 'containerd' in data
     except Exception:
         return False
 
+@functools.lru_cache(maxsize=1)
 def is_kubernetes():
     return os.path.exists('/var/run/secrets/kubernetes.io') or \
            os.environ.get('KUBERNETES_SERVICE_HOST') is not None
 
-def collect_docker_info():
+def _read_int(path):
+    with open(path) as f:
+        return int(f.read().split()[0])
+
+def _cgroup_stats(container_id):
+    """
+    Return (cpu_total_ns, mem_usage) for a running container straight from its cgroup,
+    or None when the cgroup is not visible from here.
+    """
+    for pattern in CGROUP_V2_DIRS:
+        base = os.path.join(CGROUP_ROOT, pattern.format(id=container_id))
+        try:
+            with open(os.path.join(base, 'cpu.stat')) as f:
+                usage_usec = next(int(line.split()[1]) for line in f if line.startswith('usage_usec'))
+            return usage_usec * 1000, _read_int(os.path.join(base, 'memory.current'))
+        except (OSError, StopIteration, ValueError):
+            continue
+    try:
+        return (_read_int(os.path.join(CGROUP_ROOT, CGROUP_V1_CPU.format(id=container_id))),
+                _read_int(os.path.join(CGROUP_ROOT, CGROUP_V1_MEM.format(id=container_id))))
+    except (OSError, ValueError):
+        return None
+
+def _container_usage(c):
+    # cgroup files are microsecond reads; the stats API samples for ~1-2s per container
+    if c.status != 'running':
+        return None, None
+    usage = _cgroup_stats(c.id)
+    if usage is not None:
+        return usage
+    stats = c.stats(stream=False)
+    return (stats['cpu_stats']['cpu_usage']['total_usage'] if 'cpu_stats' in stats else None,
+            stats['memory_stats']['usage'] if 'memory_stats' in stats else None)
+
+def _container_entry(c):
     try:
+        cpu_usage, mem_usage = _container_usage(c)
+        return {
+            'id': c.id,
+            'name': c.name,
+            'image': c.image.tags,
+            'status': c.status,
+            'created': c.attrs.get('Created'),
+            'ports': c.attrs.get('NetworkSettings', {}).get('Ports'),
+            'mounts': c.attrs.get('Mounts'),
+            'labels': c.labels,
+            'cpu_percent': cpu_usage,
+            'mem_usage': mem_usage,
+            'networks': c.attrs.get('NetworkSettings', {}).get('Networks'),
+            'processes': c.top()['Processes'] if hasattr(c, 'top') else None,
+        }
+    except Exception as e:
+        return {'id': c.id, 'error': str(e)}
+
+_DOCKER_CLIENT = None
+
+def _docker_client():
+    # from_env() parses the environment and negotiates the API version; do it once
+    global _DOCKER_CLIENT
+    if _DOCKER_CLIENT is None:
         import docker
-        client = docker.from_env()
-        containers = []
-        for c in client.containers.list(all=True):
-            try:
-                stats = c.stats(stream=False)
-                containers.append({
-                    'id': c.id,
-                    'name': c.name,
-                    'image': c.image.tags,
-                    'status': c.status,
-                    'created': c.attrs.get('Created'),
-                    'ports': c.attrs.get('NetworkSettings', {}).get('Ports'),
-                    'mounts': c.attrs.get('Mounts'),
-                    'labels': c.labels,
-                    'cpu_percent': stats['cpu_stats']['cpu_usage']['total_usage'] if 'cpu_stats' in stats else None,
-                    'mem_usage': stats['memory_stats']['usage'] if 'memory_stats' in stats else None,
-                    'networks': c.attrs.get('NetworkSettings', {}).get('Networks'),
-                    'processes': c.top()['Processes'] if hasattr(c, 'top') else None,
-                })
-            except Exception as e:
-                containers.append({'id': c.id, 'error': str(e)})
+        _DOCKER_CLIENT = docker.from_env()
+    return _DOCKER_CLIENT
+
+def collect_docker_info():
+    global _DOCKER_CLIENT
+    try:
+        client = _docker_client()
+        container_list = client.containers.list(all=True)
+        # Remaining per-container API calls (image, top, stats fallback) run concurrently
+        with ThreadPoolExecutor(max_workers=DOCKER_STATS_WORKERS) as pool:
+            containers = list(pool.map(_container_entry, container_list))
         images = [img.tags for img in client.images.list()]
         return {'containers': containers, 'images': images}
     except ImportError:
         return {'error': 'docker-py not installed'}
     except Exception as e:
+        # Daemon restarted or socket went away; reconnect on the next collection
+        _DOCKER_CLIENT = None
         return {'error': str(e)}
 
 def collect_k8s_info():
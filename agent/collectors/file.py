@@ -1,7 +1,13 @@
 import os
-import hashlib
+import time
+import functools
+import itertools
+import collections
 from datetime import datetime
 
+from ._hashutil import cached_sha256, hash_files
+from ._fsutil import iter_files, IO_EXECUTOR
+
 try:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
@@ -16,7 +22,10 @@ except ImportError:
     YARA_AVAILABLE = False
 
 SENSITIVE_DIRS = ["/etc", "/var", "/home", "/tmp", "/usr/bin", "/usr/sbin"]
-FILE_EVENTS = []
+FILE_EVENTS_MAX = 10000
+# Bounded so an event storm drops the oldest events instead of growing without limit;
+# append/popleft are atomic, so the watchdog thread needs no lock
+FILE_EVENTS = collections.deque(maxlen=FILE_EVENTS_MAX)
 
 class FileChangeHandler(FileSystemEventHandler):
     def on_any_event(self, event):
@@ -24,7 +33,8 @@ class FileChangeHandler(FileSystemEventHandler):
             "event_type": event.event_type,
             "src_path": event.src_path,
             "is_directory": event.is_directory,
-            "timestamp": datetime.utcnow().isoformat()
+            # Raw clock read in the watchdog thread; formatted when the batch is collected
+            "timestamp": time.time_ns()
         })
 
 def start_file_monitor(paths=SENSITIVE_DIRS):
@@ -40,11 +50,18 @@ def start_file_monitor(paths=SENSITIVE_DIRS):
 
 def hash_file(path):
     try:
-        with open(path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        return cached_sha256(path)
     except Exception:
         return None
 
+@functools.lru_cache(maxsize=4)
+def _compile_rules(path, mtime_ns):
+    # Keyed on mtime so an edited rules file is recompiled on the next collection
+    return yara.compile(filepath=path)
+
+def load_yara_rules(path):
+    return _compile_rules(path, os.stat(path).st_mtime_ns)
+
 def scan_with_yara(path, rules=None):
     if not YARA_AVAILABLE or not rules:
         return None
@@ -54,19 +71,22 @@ def scan_with_yara(path, rules=None):
     except Exception:
         return None
 
+SUSPICIOUS_SUFFIXES = ('.tmp', '.bak', '.sh', '.py', '.exe')
+
+def _is_suspicious_name(fname):
+    # Example: suspicious if hidden, temp, or script in startup.
+    # str.startswith/endswith with a tuple beat a compiled regex here (C-level prefix/suffix compares).
+    return fname.startswith('.') or fname.endswith(SUSPICIOUS_SUFFIXES)
+
+def _walk_sensitive_dirs(root_dirs=SENSITIVE_DIRS, name_filter=None):
+    """Return every file path under root_dirs; each top-level root is walked on its own thread."""
+    paths = []
+    for found in IO_EXECUTOR.map(lambda root: list(iter_files(root, name_filter)), root_dirs):
+        paths.extend(found)
+    return paths
+
 def find_suspicious_files(root_dirs=SENSITIVE_DIRS):
-    suspicious = []
-    for root in root_dirs:
-        for dirpath, dirnames, filenames in os.walk(root):
-            for fname in filenames:
-                fpath = os.path.join(dirpath, fname)
-                try:
-                    # Example: suspicious if hidden, temp, or script in startup
-                    if fname.startswith('.') or fname.endswith(('.tmp', '.bak', '.sh', '.py', '.exe')):
-                        suspicious.append(fpath)
-                except Exception:
-                    continue
-    return suspicious
+    return _walk_sensitive_dirs(root_dirs, _is_suspicious_name)
 
 def collect_file_events(yara_rules_path=None):
     """
@@ -75,28 +95,38 @@ def collect_file_events(yara_rules_path=None):
     """
     result = {"timestamp": datetime.utcnow().isoformat()}
     # File events (since last call)
-    result["file_events"] = list(FILE_EVENTS)
-    FILE_EVENTS.clear()
+    # Drain with popleft so events appended by the watchdog thread meanwhile are neither lost nor repeated
+    events = []
+    try:
+        while True:
+            events.append(FILE_EVENTS.popleft())
+    except IndexError:
+        pass
+    for event in events:
+        event["timestamp"] = datetime.utcfromtimestamp(event["timestamp"] / 1e9).isoformat()
+    result["file_events"] = events
     # Hashes of critical files
     critical_files = ["/etc/passwd", "/etc/shadow", "/etc/hosts", "/bin/bash"]
-    result["file_hashes"] = {f: hash_file(f) for f in critical_files if os.path.exists(f)}
-    # YARA scan
+    result["file_hashes"] = hash_files([f for f in critical_files if os.path.exists(f)], hash_file)
+    # YARA scan and suspicious files share a single walk of SENSITIVE_DIRS
+    paths = None
     if YARA_AVAILABLE and yara_rules_path and os.path.exists(yara_rules_path):
         try:
-            rules = yara.compile(filepath=yara_rules_path)
+            rules = load_yara_rules(yara_rules_path)
             yara_results = {}
-            for root in SENSITIVE_DIRS:
-                for dirpath, dirnames, filenames in os.walk(root):
-                    for fname in filenames:
-                        fpath = os.path.join(dirpath, fname)
-                        matches = scan_with_yara(fpath, rules)
-                        if matches:
-                            yara_results[fpath] = matches
+            paths = _walk_sensitive_dirs()
+            # yara releases the GIL while scanning, so files are matched concurrently
+            for fpath, matches in zip(paths, IO_EXECUTOR.map(scan_with_yara, paths, itertools.repeat(rules))):
+                if matches:
+                    yara_results[fpath] = matches
             result["yara_results"] = yara_results
         except Exception as e:
             result["yara_error"] = str(e)
     else:
         result["yara_results"] = {}
     # Suspicious files
-    result["suspicious_files"] = find_suspicious_files()
+    if paths is None:
+        result["suspicious_files"] = find_suspicious_files()
+    else:
+        result["suspicious_files"] = [p for p in paths if _is_suspicious_name(os.path.basename(p))]
     return result
\ No newline at end of file
@@ -1,10 +1,13 @@
-import os
 import subprocess
 from datetime import datetime
-import glob
+
+from ._journal import journal_tail
+from ._cmdutil import run_concurrently
+from ._fsutil import list_log_files, read_log_tails, keyword_matcher
 
 FIREWALL_LOG_EXTENSIONS = [".log", ".err", ".out", ".journal"]
 FIREWALL_LOG_KEYWORDS = ["firewall", "iptables", "nft", "ufw", "firewalld"]
+_is_firewall_log = keyword_matcher(FIREWALL_LOG_KEYWORDS)
 MAX_LINES = 200
 
 
@@ -37,25 +40,11 @@ def collect_firewalld_status():
         return f"error: {e}"
 
 def collect_firewall_logs(log_dirs=["/var/log"], extensions=FIREWALL_LOG_EXTENSIONS, max_lines=MAX_LINES):
-    logs = {}
-    for log_dir in log_dirs:
-        for ext in extensions:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                if any(kw in log_file.lower() for kw in FIREWALL_LOG_KEYWORDS):
-                    try:
-                        with open(log_file, 'r', errors='ignore') as f:
-                            lines = f.readlines()[-max_lines:]
-                            logs[log_file] = ''.join(lines)
-                    except Exception as e:
-                        logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, extensions, path_filter=_is_firewall_log), max_lines)
 
 def collect_firewall_journalctl(lines=200):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-g', 'firewall', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, grep='firewall')
         return output
     except Exception as e:
         return f"error: {e}"
@@ -66,10 +55,13 @@ def collect_firewall_rules():
     Returns a dict.
     """
     result = {"timestamp": datetime.utcnow().isoformat()}
-    result["iptables_rules"] = collect_iptables_rules()
-    result["nftables_rules"] = collect_nftables_rules()
-    result["ufw_status"] = collect_ufw_status()
-    result["firewalld_status"] = collect_firewalld_status()
-    result["firewall_logs"] = collect_firewall_logs()
-    result["firewall_journalctl"] = collect_firewall_journalctl()
+    # The four tools and journalctl are separate processes; fork them all at once
+    result.update(run_concurrently({
+        "iptables_rules": collect_iptables_rules,
+        "nftables_rules": collect_nftables_rules,
+        "ufw_status": collect_ufw_status,
+        "firewalld_status": collect_firewalld_status,
+        "firewall_logs": collect_firewall_logs,
+        "firewall_journalctl": collect_firewall_journalctl,
+    }))
     return result
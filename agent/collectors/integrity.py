@@ -1,10 +1,13 @@
 import os
-import hashlib
-import glob
-import subprocess
 from datetime import datetime
 
+from ._journal import journal_tail
+from ._hashutil import cached_sha256, hash_files
+from ._fsutil import iter_files, list_log_files, read_log_tails, keyword_matcher
+
 MAX_LINES = 200
+INTEGRITY_LOG_KEYWORDS = ["integrity", "tamper", "hash", "checksum", "tripwire"]
+_is_integrity_log = keyword_matcher(INTEGRITY_LOG_KEYWORDS)
 AGENT_PATHS = [
     __file__,
     os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "agent.py")),
@@ -18,18 +21,13 @@ KNOWN_GOOD_HASHES = {
 
 def hash_file(path):
     try:
-        with open(path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        return cached_sha256(path)
     except Exception as e:
         return f"error: {e}"
 
 def hash_directory(directory):
-    hashes = {}
-    for root, dirs, files in os.walk(directory):
-        for fname in files:
-            fpath = os.path.join(root, fname)
-            hashes[fpath] = hash_file(fpath)
-    return hashes
+    # Walk first, then hash the collected paths in parallel
+    return hash_files(iter_files(directory), hash_file)
 
 def check_agent_integrity():
     """
@@ -54,26 +52,11 @@ def check_agent_integrity():
     return result
 
 def collect_integrity_logs(log_dirs=["/var/log"], max_lines=MAX_LINES):
-    logs = {}
-    keywords = ["integrity", "tamper", "hash", "checksum", "tripwire"]
-    for log_dir in log_dirs:
-        for ext in [".log", ".err", ".out", ".journal"]:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                if any(kw in log_file.lower() for kw in keywords):
-                    try:
-                        with open(log_file, 'r', errors='ignore') as f:
-                            lines = f.readlines()[-max_lines:]
-                            logs[log_file] = ''.join(lines)
-                    except Exception as e:
-                        logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, path_filter=_is_integrity_log), max_lines)
 
 def collect_integrity_journalctl(lines=200):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-g', 'integrity', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, grep='integrity')
         return output
     except Exception as e:
         return f"error: {e}"
@@ -1,9 +1,14 @@
 import os
-import glob
-import subprocess
 import platform
 from datetime import datetime
 
+from ._journal import journal_tail
+from ._fsutil import list_log_files, read_log_tails, tail_lines
+
+# Environment is fixed for the agent's lifetime; resolve the host root once
+HOST_ROOT = os.getenv('HOST_ROOT', '/')
+MONITORING_HOST = HOST_ROOT != '/'
+
 LOG_DIRS = ["/var/log"]
 LOG_EXTENSIONS = [".log", ".err", ".out", ".journal"]
 MAX_LINES = 200  # Number of lines to collect per log file
@@ -14,9 +19,7 @@ def collect_journalctl_logs(lines=200):
     Collect the last N lines from systemd journal (if available).
     """
     try:
-        output = subprocess.check_output([
-            'journalctl', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines)
         return {"journalctl": output}
     except Exception as e:
         return {"journalctl_error": str(e)}
@@ -26,18 +29,7 @@ def collect_log_files(log_dirs=LOG_DIRS, extensions=LOG_EXTENSIONS, max_lines=MA
     """
     Collect the last N lines from all log files in specified directories.
     """
-    logs = {}
-    for log_dir in log_dirs:
-        for ext in extensions:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                try:
-                    with open(log_file, 'r', errors='ignore') as f:
-                        lines = f.readlines()[-max_lines:]
-                        logs[log_file] = ''.join(lines)
-                except Exception as e:
-                    logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, extensions), max_lines)
 
 
 def collect_service_logs(services=None, lines=100):
@@ -49,9 +41,7 @@ def collect_service_logs(services=None, lines=100):
     service_logs = {}
     for svc in services:
         try:
-            output = subprocess.check_output([
-                'journalctl', '-u', svc, '-n', str(lines), '--no-pager', '--output', 'short-iso'
-            ], text=True)
+            output = journal_tail(lines, unit=svc)
             service_logs[svc] = output
         except Exception as e:
             service_logs[svc] = f"error: {e}"
@@ -88,10 +78,9 @@ def collect_log_info():
     Returns a dict.
     """
     try:
-        # Check if we're monitoring host system
-        host_root = os.getenv('HOST_ROOT', '/')
-        monitoring_host = host_root != '/'
         current_os = platform.system().lower()
+        # One collection time shared by every entry read in this pass
+        now = datetime.utcnow().isoformat()
         
         log_files = []
         log_entries = []
@@ -128,8 +117,8 @@ def collect_log_info():
             ]
         
         # Adjust paths for host monitoring
-        if monitoring_host:
-            log_paths = [os.path.join(host_root, path.lstrip('/')) for path in log_paths]
+        if MONITORING_HOST:
+            log_paths = [os.path.join(HOST_ROOT, path.lstrip('/')) for path in log_paths]
         
         for log_path in log_paths:
             if os.path.exists(log_path):
@@ -146,19 +135,17 @@ def collect_log_info():
                     # Read last few lines (only for text files)
                     if os.path.isfile(log_path) and not log_path.endswith('/'):
                         try:
-                            with open(log_path, 'r', errors='ignore') as f:
-                                lines = f.readlines()
-                                recent_lines = lines[-10:] if len(lines) > 10 else lines
-                                log_entries.extend([{
-                                    "file": log_path,
-                                    "line": line.strip(),
-                                    "timestamp": datetime.utcnow().isoformat()
-                                } for line in recent_lines if line.strip()])
+                            recent_lines = tail_lines(log_path, 10)
+                            log_entries.extend([{
+                                "file": log_path,
+                                "line": line.strip(),
+                                "timestamp": now
+                            } for line in recent_lines if line.strip()])
                         except Exception as e:
                             log_entries.append({
                                 "file": log_path,
                                 "error": f"Could not read file: {str(e)}",
-                                "timestamp": datetime.utcnow().isoformat()
+                                "timestamp": now
                             })
                     elif os.path.isdir(log_path):
                         # For directories, list some files
@@ -168,13 +155,13 @@ def collect_log_info():
                                 "file": log_path,
                                 "note": f"Directory with {len(files)} files",
                                 "sample_files": files,
-                                "timestamp": datetime.utcnow().isoformat()
+                                "timestamp": now
                             })
                         except Exception as e:
                             log_entries.append({
                                 "file": log_path,
                                 "error": f"Could not list directory: {str(e)}",
-                                "timestamp": datetime.utcnow().isoformat()
+                                "timestamp": now
                             })
                         
                 except Exception as e:
@@ -191,11 +178,11 @@ def collect_log_info():
                 })
         
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now,
             "log_files": log_files,
             "recent_entries": log_entries[:50],  # Limit to 50 entries
-            "monitoring_host": monitoring_host,
-            "host_root": host_root,
+            "monitoring_host": MONITORING_HOST,
+            "host_root": HOST_ROOT,
             "platform_type": current_os
         }
     except Exception as e:
@@ -1,14 +1,143 @@
+import os
+import socket
+import functools
+import ipaddress
+import collections
 import psutil
 from datetime import datetime
 
-def collect_network_info():
+PROC_NET = "/proc/net"
+PROC_ROOT = "/proc"
+# /proc/net table -> (family, type); the same four tables psutil reads for kind='inet'
+PROC_NET_TABLES = {
+    "tcp": (socket.AF_INET, socket.SOCK_STREAM),
+    "tcp6": (socket.AF_INET6, socket.SOCK_STREAM),
+    "udp": (socket.AF_INET, socket.SOCK_DGRAM),
+    "udp6": (socket.AF_INET6, socket.SOCK_DGRAM),
+}
+TCP_STATUSES = {
+    "01": psutil.CONN_ESTABLISHED,
+    "02": psutil.CONN_SYN_SENT,
+    "03": psutil.CONN_SYN_RECV,
+    "04": psutil.CONN_FIN_WAIT1,
+    "05": psutil.CONN_FIN_WAIT2,
+    "06": psutil.CONN_TIME_WAIT,
+    "07": psutil.CONN_CLOSE,
+    "08": psutil.CONN_CLOSE_WAIT,
+    "09": psutil.CONN_LAST_ACK,
+    "0A": psutil.CONN_LISTEN,
+    "0B": psutil.CONN_CLOSING,
+}
+# Listening on one of these is expected; anything else gets its owning process resolved
+STANDARD_PORTS = frozenset([22, 25, 53, 80, 110, 123, 143, 443, 465, 587, 993, 995, 3306, 5432, 6379, 8000, 8080])
+
+# Same fields as psutil's sconn so collect_network_info formats both identically
+_Conn = collections.namedtuple("_Conn", ["fd", "family", "type", "laddr", "raddr", "status", "pid", "inode"])
+
+def _decode_address(addr, family):
+    """Decode a /proc/net 'HEXIP:HEXPORT' field into (ip, port), or () for port 0 like psutil."""
+    ip, port = addr.split(':')
+    port = int(port, 16)
+    if not port:
+        return ()
+    raw = bytes.fromhex(ip)
+    # The address is stored as host-order 32-bit words; flip each word on little-endian hosts
+    if socket.htonl(1) != 1:
+        raw = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    return (socket.inet_ntop(family, raw), port)
+
+def _parse_proc_net(path, family, type_):
+    """Yield _Conn rows (pid unresolved) from one /proc/net/{tcp,tcp6,udp,udp6} table."""
+    try:
+        with open(path) as f:
+            f.readline()  # header
+            lines = f.readlines()
+    except OSError:
+        return
+    is_tcp = type_ == socket.SOCK_STREAM
+    for line in lines:
+        fields = line.split()
+        try:
+            laddr = _decode_address(fields[1], family)
+            raddr = _decode_address(fields[2], family)
+            inode = int(fields[9])
+        except (IndexError, ValueError, OSError):
+            continue
+        status = TCP_STATUSES.get(fields[3], psutil.CONN_NONE) if is_tcp else psutil.CONN_NONE
+        yield _Conn(-1, family, type_, laddr, raddr, status, None, inode)
+
+@functools.lru_cache(maxsize=4096)
+def _is_external(ip):
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+def _needs_owner(conn):
+    # External peers and listeners on unusual ports are worth the /proc/<pid>/fd walk
+    if conn.raddr and _is_external(conn.raddr[0]):
+        return True
+    return conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr[1] not in STANDARD_PORTS
+
+def _socket_owners(inodes, proc_root=PROC_ROOT):
+    """
+    Map socket inodes to (pid, fd) by scanning /proc/<pid>/fd, stopping as soon as
+    every requested inode has been found. Inode 0 (TIME_WAIT and other sockets no
+    process holds) never appears under /proc/<pid>/fd, so it is not looked for.
+    """
+    wanted = {f"socket:[{inode}]": inode for inode in inodes if inode}
+    owners = {}
+    if not wanted:
+        return owners
+    for entry in os.scandir(proc_root):
+        if not entry.name.isdigit():
+            continue
+        fd_dir = f"{entry.path}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            inode = wanted.get(target)
+            if inode is not None and inode not in owners:
+                owners[inode] = (int(entry.name), int(fd))
+        if len(owners) == len(wanted):
+            break
+    return owners
+
+def _proc_net_connections(deep=False, proc_net=PROC_NET):
+    """
+    Read inet sockets straight from /proc/net. Owning pid/fd are resolved only for
+    connections flagged by _needs_owner (or all of them with deep=True); the rest
+    keep psutil's "unknown" values, pid=None and fd=-1.
+    """
+    conns = []
+    for table, (family, type_) in PROC_NET_TABLES.items():
+        conns.extend(_parse_proc_net(os.path.join(proc_net, table), family, type_))
+    owners = _socket_owners({c.inode for c in conns if deep or _needs_owner(c)})
+    for i, c in enumerate(conns):
+        owner = owners.get(c.inode)
+        if owner is not None:
+            conns[i] = c._replace(pid=owner[0], fd=owner[1])
+    return conns
+
+def _net_connections(deep=False):
+    if psutil.LINUX and os.path.isdir(PROC_NET):
+        return _proc_net_connections(deep)
+    return psutil.net_connections(kind='inet')
+
+def collect_network_info(deep=False):
     """
     Collect network connections, interfaces, ARP, DNS, packet capture.
     Returns a dict.
     """
     try:
         conns = []
-        for c in psutil.net_connections(kind='inet'):
+        for c in _net_connections(deep):
             try:
                 conns.append({
                     "fd": c.fd,
@@ -35,4 +164,4 @@ def collect_network_info():
             "packet_capture": []  # TODO: implement with scapy/pyshark
         }
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
@@ -1,9 +1,14 @@
 import os
-import glob
 import subprocess
 from datetime import datetime
 
+from ._journal import journal_tail
+from ._cmdutil import run_concurrently
+from ._fsutil import list_log_files, read_log_tails, keyword_matcher
+
 MAX_LINES = 200
+PERSISTENCE_LOG_KEYWORDS = ["cron", "systemd", "init", "rc.local", "at", "autorun", "service"]
+_is_persistence_log = keyword_matcher(PERSISTENCE_LOG_KEYWORDS)
 
 
 def collect_cron_jobs():
@@ -45,26 +50,11 @@ def collect_at_jobs():
         return f"error: {e}"
 
 def collect_persistence_logs(log_dirs=["/var/log"], max_lines=MAX_LINES):
-    logs = {}
-    keywords = ["cron", "systemd", "init", "rc.local", "at", "autorun", "service"]
-    for log_dir in log_dirs:
-        for ext in [".log", ".err", ".out", ".journal"]:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                if any(kw in log_file.lower() for kw in keywords):
-                    try:
-                        with open(log_file, 'r', errors='ignore') as f:
-                            lines = f.readlines()[-max_lines:]
-                            logs[log_file] = ''.join(lines)
-                    except Exception as e:
-                        logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, path_filter=_is_persistence_log), max_lines)
 
 def collect_persistence_journalctl(lines=200):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-g', 'cron', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, grep='cron')
         return output
     except Exception as e:
         return f"error: {e}"
@@ -75,11 +65,14 @@ def collect_persistence_info():
     Returns a dict.
     """
     result = {"timestamp": datetime.utcnow().isoformat()}
-    result["cron_jobs"] = collect_cron_jobs()
-    result["systemd_services"] = collect_systemd_services()
-    result["enabled_services"] = collect_enabled_services()
-    result["init_scripts"] = collect_init_scripts()
-    result["at_jobs"] = collect_at_jobs()
-    result["persistence_logs"] = collect_persistence_logs()
-    result["persistence_journalctl"] = collect_persistence_journalctl()
+    # crontab, systemctl (x2), atq and journalctl are independent processes; run them together
+    result.update(run_concurrently({
+        "cron_jobs": collect_cron_jobs,
+        "systemd_services": collect_systemd_services,
+        "enabled_services": collect_enabled_services,
+        "init_scripts": collect_init_scripts,
+        "at_jobs": collect_at_jobs,
+        "persistence_logs": collect_persistence_logs,
+        "persistence_journalctl": collect_persistence_journalctl,
+    }))
     return result
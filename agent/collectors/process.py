@@ -1,38 +1,216 @@
 import psutil
 import os
-import hashlib
+import pwd
+import functools
 from datetime import datetime
 
+from ._hashutil import cached_sha256, hash_files
+
+# Environment is fixed for the agent's lifetime; resolve the host root once
+HOST_ROOT = os.getenv('HOST_ROOT', '/')
+MONITORING_HOST = HOST_ROOT != '/'
+
+def _safe_exe_hash(exe):
+    try:
+        if exe and os.path.isfile(exe):
+            return cached_sha256(exe)
+    except Exception:
+        pass
+    return None
+
+def _hash_exes(exes):
+    """
+    Hash each distinct executable once, concurrently; hashlib and file reads release the GIL.
+    Returns {exe: sha256 or None}.
+    """
+    return hash_files(set(filter(None, exes)), _safe_exe_hash)
+
 def hash_file(path):
     try:
-        with open(path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        return cached_sha256(path)
     except Exception:
         return None
 
-def collect_process_info():
+PROC_ROOT = "/proc"
+PROC_ATTRS = ['pid', 'name', 'username', 'cmdline', 'ppid', 'create_time', 'exe']
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+# Kernel truncates /proc/<pid>/stat comm to 15 characters
+_COMM_LEN = 15
+
+@functools.lru_cache(maxsize=1024)
+def _uid_to_name(uid):
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+PROC_READ_SIZE = 1 << 16
+
+def _read_proc_file(name, dir_fd):
+    # Raw os.open/os.read relative to the pid directory: no path walk, no file object
+    fd = os.open(name, os.O_RDONLY, dir_fd=dir_fd)
+    try:
+        data = os.read(fd, PROC_READ_SIZE)
+        if len(data) < PROC_READ_SIZE:
+            return data
+        chunks = [data]
+        while chunk := os.read(fd, PROC_READ_SIZE):
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+def _read_pid_dir(base):
+    """Return (stat, cmdline, status, exe) for one /proc/<pid> directory."""
+    dir_fd = os.open(base, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        stat = _read_proc_file("stat", dir_fd)
+        raw_cmdline = _read_proc_file("cmdline", dir_fd)
+        status = _read_proc_file("status", dir_fd)
+        try:
+            exe = os.readlink("exe", dir_fd=dir_fd)
+        except FileNotFoundError:
+            # Kernel threads have no executable; psutil reports them as ''
+            exe = ''
+        except OSError:
+            exe = None
+    finally:
+        os.close(dir_fd)
+    return stat, raw_cmdline, status, exe
+
+def _parse_proc_stat(stat, boot_time):
+    """
+    Parse /proc/<pid>/stat into (name, ppid, create_time).
+    comm may contain spaces and parentheses, so split around the last ')'.
+    """
+    rpar = stat.rindex(b')')
+    name = stat[stat.index(b'(') + 1:rpar].decode(errors='replace')
+    fields = stat[rpar + 2:].split()
+    # fields[0] is state (field 3 in proc(5)); ppid is field 4, starttime field 22
+    return name, int(fields[1]), boot_time + int(fields[19]) / _CLK_TCK
+
+def _expand_name(name, cmdline):
+    # Same rule psutil applies: recover a truncated comm from argv[0]
+    if len(name) >= _COMM_LEN and cmdline:
+        extended = os.path.basename(cmdline[0])
+        if extended.startswith(name):
+            return extended
+    return name
+
+def _fast_process_iter(proc_root=PROC_ROOT):
+    """
+    Yield process info dicts straight from Linux /proc, bypassing psutil.process_iter.
+    Fields match PROC_ATTRS with psutil-compatible values.
+    """
+    boot_time = psutil.boot_time()
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        try:
+            stat, raw_cmdline, status, exe = _read_pid_dir(f"{proc_root}/{entry}")
+        except OSError:
+            # Process exited or is not readable
+            continue
+        try:
+            name, ppid, create_time = _parse_proc_stat(stat, boot_time)
+            username = None
+            for line in status.splitlines():
+                if line.startswith(b'Uid:'):
+                    username = _uid_to_name(int(line.split()[1]))
+                    break
+        except (ValueError, IndexError):
+            continue
+        cmdline = [arg.decode(errors='replace') for arg in raw_cmdline.split(b'\0') if arg]
+        yield {
+            "pid": int(entry),
+            "name": _expand_name(name, cmdline),
+            "username": username,
+            "cmdline": cmdline,
+            "ppid": ppid,
+            "create_time": create_time,
+            "exe": exe,
+        }
+
+def _oneshot_info(p):
+    # oneshot() parses stat/status once and serves name, ppid, create_time, username from it
+    info = {'pid': p.pid}
+    with p.oneshot():
+        for attr in PROC_ATTRS[1:]:
+            try:
+                info[attr] = getattr(p, attr)()
+            except psutil.AccessDenied:
+                info[attr] = None
+    return info
+
+def _psutil_process_iter():
+    for p in psutil.process_iter():
+        try:
+            yield _oneshot_info(p)
+        except Exception:
+            continue
+
+def _process_iter():
+    # Other platforms with a /proc (FreeBSD procfs, Solaris) lack Linux's stat/status layout
+    return _fast_process_iter() if psutil.LINUX else _psutil_process_iter()
+
+def _is_kernel_thread(info):
+    # kthreadd (pid 2, ppid 0) and its children have no executable image. init also has
+    # ppid 0, and its exe link is unreadable without root, so pid 1 is never one.
+    return info.get('pid') != 1 and not info.get('exe') and info.get('ppid') in (0, 2)
+
+def list_processes():
+    """Return PROC_ATTRS for every process plus the exe's sha256."""
+    procs = list(_process_iter())
+    hashes = _hash_exes([info.get('exe') for info in procs if not _is_kernel_thread(info)])
+    for info in procs:
+        info['sha256'] = hashes.get(info.get('exe'))
+    return procs
+
+# (pid, create_time) of every process seen by the previous collection
+_SEEN_PROCS = set()
+
+def _needs_deep_inspection(info, seen):
+    # Cheap first pass: only processes that appeared since the last poll, or whose
+    # binary could not be hashed (deleted, replaced or unreadable), are inspected further
+    if (info['pid'], info.get('create_time')) not in seen:
+        return True
+    return bool(info.get('exe')) and info.get('sha256') is None
+
+def collect_process_info(deep=False):
     """
     Collect process list, memory maps, loaded modules, hashes, suspicious behaviors.
+    open_files/memory_maps are only gathered for processes flagged by _needs_deep_inspection,
+    unless deep=True; other processes carry no such keys.
     Returns a dict.
     """
+    global _SEEN_PROCS
     processes = []
     try:
-        # Check if we're monitoring host system
-        host_root = os.getenv('HOST_ROOT', '/')
-        monitoring_host = host_root != '/'
-        
-        for p in psutil.process_iter(['pid', 'name', 'username', 'cmdline', 'ppid', 'create_time', 'exe']):
+        procs = list_processes()
+        seen = _SEEN_PROCS
+        _SEEN_PROCS = {(info['pid'], info.get('create_time')) for info in procs}
+        for info in procs:
             try:
-                info = p.info
                 exe = info.get('exe')
                 
                 # Adjust executable path for host monitoring
-                if monitoring_host and exe and exe.startswith('/'):
+                if MONITORING_HOST and exe and exe.startswith('/'):
                     # If monitoring host, executable paths should be relative to host root
                     # but psutil will already show the correct paths when using host network mode
                     pass
                 
-                info['sha256'] = hash_file(exe) if exe and os.path.isfile(exe) else None
+                if _is_kernel_thread(info):
+                    # Kernel threads map no files; skip the /proc/<pid>/fd and smaps reads
+                    info['open_files'] = []
+                    info['memory_maps'] = []
+                    processes.append(info)
+                    continue
+                
+                if not deep and not _needs_deep_inspection(info, seen):
+                    processes.append(info)
+                    continue
+                
+                p = psutil.Process(info['pid'])
                 # Optionally, add open files, memory maps, loaded modules
                 info['open_files'] = [f.path for f in p.open_files()] if hasattr(p, 'open_files') else []
                 info['memory_maps'] = [m.path for m in p.memory_maps()] if hasattr(p, 'memory_maps') else []
@@ -42,8 +220,8 @@ def collect_process_info():
         return {
             "timestamp": datetime.utcnow().isoformat(),
             "processes": processes,
-            "monitoring_host": monitoring_host,
-            "host_root": host_root,
+            "monitoring_host": MONITORING_HOST,
+            "host_root": HOST_ROOT,
         }
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
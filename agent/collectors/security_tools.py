@@ -1,12 +1,18 @@
 import os
-import glob
+import re
 import subprocess
 from datetime import datetime
 
+from ._journal import journal_tail
+from ._cmdutil import CMD_EXECUTOR
+from ._fsutil import list_log_files, read_log_tails
+
 SECURITY_TOOLS = [
     "clamav", "crowdstrike", "sophos", "falcon", "defender", "chkrootkit", "rkhunter", "auditd", "selinux", "apparmor"
 ]
 MAX_LINES = 200
+# Case-sensitive, like the "*{tool}*{ext}" globs it replaces
+_TOOL_NAME_RE = re.compile('|'.join(map(re.escape, SECURITY_TOOLS)))
 
 
 def check_tool_status(tool):
@@ -24,25 +30,14 @@ def check_tool_status(tool):
 
 
 def collect_security_tool_logs(log_dirs=["/var/log"], max_lines=MAX_LINES):
-    logs = {}
-    for tool in SECURITY_TOOLS:
-        for ext in [".log", ".err", ".out", ".journal"]:
-            pattern = os.path.join(log_dirs[0], f"*{tool}*{ext}")
-            for log_file in glob.glob(pattern):
-                try:
-                    with open(log_file, 'r', errors='ignore') as f:
-                        lines = f.readlines()[-max_lines:]
-                        logs[log_file] = ''.join(lines)
-                except Exception as e:
-                    logs[log_file] = f"error: {e}"
-    return logs
+    # One directory listing matched against every tool, instead of a glob per tool and extension
+    paths = list_log_files(log_dirs[:1], path_filter=lambda p: _TOOL_NAME_RE.search(os.path.basename(p)))
+    return read_log_tails(paths, max_lines)
 
 
 def collect_security_tool_journalctl(tool, lines=100):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-u', tool, '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, unit=tool)
         return output
     except Exception as e:
         return f"error: {e}"
@@ -54,8 +49,11 @@ def collect_security_tools_status():
     Returns a dict.
     """
     result = {"timestamp": datetime.utcnow().isoformat(), "tools": {}, "logs": {}, "journalctl": {}}
+    # systemctl/pgrep probes are independent child processes; run them all at once
+    statuses = CMD_EXECUTOR.map(check_tool_status, SECURITY_TOOLS)
+    # The log scan already covers every tool, so it runs once rather than per tool
+    result["logs"] = collect_security_tool_logs(["/var/log"], MAX_LINES)
     for tool in SECURITY_TOOLS:
-        result["tools"][tool] = check_tool_status(tool)
-        result["logs"].update(collect_security_tool_logs(["/var/log"], MAX_LINES))
         result["journalctl"][tool] = collect_security_tool_journalctl(tool)
+    result["tools"] = dict(zip(SECURITY_TOOLS, statuses))
     return result
@@ -4,75 +4,99 @@ import time
 import os
 from datetime import datetime
 
+# Environment is fixed for the agent's lifetime; resolve the host root once
+HOST_ROOT = os.getenv('HOST_ROOT', '/')
+MONITORING_HOST = HOST_ROOT != '/'
+
+def _cpu_times_split():
+    # Same busy/total accounting as psutil.cpu_percent (guest time is already in user on Linux)
+    times = psutil.cpu_times()
+    total = sum(times) - getattr(times, "guest", 0) - getattr(times, "guest_nice", 0)
+    idle = times.idle + getattr(times, "iowait", 0)
+    return total, total - idle
+
+# Private baseline, primed at import: psutil.cpu_percent(None) keeps one global sample
+# that any other caller would reset mid-interval.
+_prev_cpu_times = _cpu_times_split()
+
+def _cpu_percent_between(prev, cur):
+    """CPU utilisation between two (total, busy) samples from _cpu_times_split()."""
+    total_delta = cur[0] - prev[0]
+    if total_delta <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, (cur[1] - prev[1]) / total_delta * 100)), 1)
+
+def _cpu_percent_since_last():
+    """System CPU utilisation since the previous collection, without sleeping."""
+    global _prev_cpu_times
+    prev, _prev_cpu_times = _prev_cpu_times, _cpu_times_split()
+    return _cpu_percent_between(prev, _prev_cpu_times)
+
+def _static_system_info():
+    # None of this changes while the agent runs; platform.platform()/version() may shell out to uname
+    return {
+        "cpu_count": psutil.cpu_count(),
+        "boot_time": psutil.boot_time(),
+        "os": platform.system(),
+        "os_version": platform.version(),
+        "platform": platform.platform(),
+        "kernel": platform.release(),
+        "hostname": platform.node(),
+        "architecture": platform.machine(),
+        "python_version": platform.python_version(),
+        "platform_type": platform.system().lower(),
+    }
+
+_STATIC_INFO = _static_system_info()
+
 def collect_system_metrics():
     """
     Collect system metrics: CPU, memory, disk, load average, uptime, OS/kernel info, time drift.
     Returns a dict.
     """
     try:
-        # Check if we're monitoring host system
-        host_root = os.getenv('HOST_ROOT', '/')
-        monitoring_host = host_root != '/'
-        
         # Detect platform
-        current_os = platform.system().lower()
+        current_os = _STATIC_INFO["platform_type"]
+        
+        # One sample of each; every attribute access used to re-read /proc/meminfo or statfs
+        vm = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        now = datetime.utcnow().isoformat()
         
         # Platform-specific data collection
         system_info = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "cpu_count": psutil.cpu_count(),
-            "mem_total": psutil.virtual_memory().total,
-            "mem_used": psutil.virtual_memory().used,
-            "mem_percent": psutil.virtual_memory().percent,
-            "swap_total": psutil.swap_memory().total,
-            "swap_used": psutil.swap_memory().used,
-            "uptime": time.time() - psutil.boot_time(),
-            "os": platform.system(),
-            "os_version": platform.version(),
-            "platform": platform.platform(),
-            "kernel": platform.release(),
-            "hostname": platform.node(),
-            "architecture": platform.machine(),
-            "python_version": platform.python_version(),
-            "time_utc": datetime.utcnow().isoformat(),
-            "monitoring_host": monitoring_host,
-            "host_root": host_root,
+            "timestamp": now,
+            "cpu_percent": _cpu_percent_since_last(),
+            "cpu_count": _STATIC_INFO["cpu_count"],
+            "mem_total": vm.total,
+            "mem_used": vm.used,
+            "mem_percent": vm.percent,
+            "swap_total": swap.total,
+            "swap_used": swap.used,
+            "uptime": time.time() - _STATIC_INFO["boot_time"],
+            "os": _STATIC_INFO["os"],
+            "os_version": _STATIC_INFO["os_version"],
+            "platform": _STATIC_INFO["platform"],
+            "kernel": _STATIC_INFO["kernel"],
+            "hostname": _STATIC_INFO["hostname"],
+            "architecture": _STATIC_INFO["architecture"],
+            "python_version": _STATIC_INFO["python_version"],
+            "time_utc": now,
+            "monitoring_host": MONITORING_HOST,
+            "host_root": HOST_ROOT,
             "platform_type": current_os
         }
         
-        # Platform-specific metrics
-        if current_os == "linux":
-            # Linux-specific metrics
-            system_info.update({
-                "load_avg": psutil.getloadavg() if hasattr(psutil, "getloadavg") else None,
-                "disk_total": psutil.disk_usage(host_root).total,
-                "disk_used": psutil.disk_usage(host_root).used,
-                "disk_percent": psutil.disk_usage(host_root).percent,
-            })
-        elif current_os == "darwin":  # macOS
-            # macOS-specific metrics
-            system_info.update({
-                "load_avg": psutil.getloadavg() if hasattr(psutil, "getloadavg") else None,
-                "disk_total": psutil.disk_usage(host_root).total,
-                "disk_used": psutil.disk_usage(host_root).used,
-                "disk_percent": psutil.disk_usage(host_root).percent,
-            })
-        elif current_os == "windows":
-            # Windows-specific metrics
-            system_info.update({
-                "disk_total": psutil.disk_usage(host_root).total,
-                "disk_used": psutil.disk_usage(host_root).used,
-                "disk_percent": psutil.disk_usage(host_root).percent,
-            })
-        else:
-            # Generic fallback
-            system_info.update({
-                "disk_total": psutil.disk_usage(host_root).total,
-                "disk_used": psutil.disk_usage(host_root).used,
-                "disk_percent": psutil.disk_usage(host_root).percent,
-            })
+        # On Linux/macOS this is libc getloadavg(); on Windows psutil emulates it from a
+        # background processor-queue sampler started by the first call
+        system_info["load_avg"] = psutil.getloadavg() if hasattr(psutil, "getloadavg") else None
+        disk = psutil.disk_usage(HOST_ROOT)
+        system_info.update({
+            "disk_total": disk.total,
+            "disk_used": disk.used,
+            "disk_percent": disk.percent,
+        })
         
         return system_info
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
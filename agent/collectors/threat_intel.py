@@ -1,10 +1,26 @@
 import os
+import time
+import asyncio
+import functools
+import ipaddress
+import threading
 import requests
-import glob
-import subprocess
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from ._journal import journal_tail
+from ._fsutil import list_log_files, read_log_tails, keyword_matcher
+
 MAX_LINES = 200
+THREAT_INTEL_LOG_KEYWORDS = ["threat", "intel", "virustotal", "otx", "abuseipdb", "shodan"]
+_is_threat_intel_log = keyword_matcher(THREAT_INTEL_LOG_KEYWORDS)
 
 # API keys from environment variables
 VT_API_KEY = os.getenv("VT_API_KEY")
@@ -12,96 +28,282 @@ OTX_API_KEY = os.getenv("OTX_API_KEY")
 ABUSEIPDB_API_KEY = os.getenv("ABUSEIPDB_API_KEY")
 SHODAN_API_KEY = os.getenv("SHODAN_API_KEY")
 
+INTEL_TIMEOUT = 10  # seconds, per lookup
+INTEL_CONCURRENCY = 10  # lookups in flight at once across all providers
+
+RETRY_AFTER_CAP = 5  # seconds; longest Retry-After we wait out inside a collection pass
+
+class _CappedRetry(Retry):
+    """Retry that waits min(Retry-After, RETRY_AFTER_CAP) instead of whatever the provider asks."""
+
+    def sleep(self, response=None):
+        retry_after = self.get_retry_after(response) if response is not None else None
+        if retry_after:
+            time.sleep(min(retry_after, RETRY_AFTER_CAP))
+        else:
+            super().sleep(response)
+
+# Keep-alive pool shared by the sync lookups, so repeat queries to a provider skip the TLS handshake.
+# 429/503 responses are retried; a provider asking for a longer pause than RETRY_AFTER_CAP just
+# gets the non-200 answer back, which is not cached, and is asked again next pass.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=_CappedRetry(total=2, backoff_factor=0.2, status_forcelist=(429, 503),
+                             allowed_methods=frozenset(["GET"]), respect_retry_after_header=False,
+                             raise_on_status=False),
+))
+
+INTEL_CACHE_TTL = 6 * 3600  # seconds; reputation answers are stable for hours and provider quotas are tight
+INTEL_CACHE_SIZE = 10000
+# (provider, indicator) -> (expires, response); only HTTP 200 answers are kept
+_INTEL_CACHE = {}
+_INTEL_CACHE_LOCK = threading.Lock()
+
+def _cache_get(key):
+    hit = _INTEL_CACHE.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+def _cache_put(key, status, response):
+    # Quota/rate-limit bodies (e.g. AbuseIPDB's {"errors": [...]}) come with non-200 statuses
+    if status != 200 or not isinstance(response, dict) or "error" in response:
+        return
+    with _INTEL_CACHE_LOCK:
+        if len(_INTEL_CACHE) >= INTEL_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            _INTEL_CACHE.pop(next(iter(_INTEL_CACHE)), None)
+        _INTEL_CACHE[key] = (time.monotonic() + INTEL_CACHE_TTL, response)
+
+def _intel_cached(provider):
+    """
+    Serve a lookup from _INTEL_CACHE by (provider, indicator); the indicator is the last argument.
+    The wrapped function returns (http_status, response); callers only see the response.
+    """
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args):
+                key = (provider, args[-1])
+                response = _cache_get(key)
+                if response is None:
+                    status, response = await fn(*args)
+                    _cache_put(key, status, response)
+                return response
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = (provider, args[-1])
+            response = _cache_get(key)
+            if response is None:
+                status, response = fn(*args)
+                _cache_put(key, status, response)
+            return response
+        return wrapper
+    return decorator
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_ip(ip):
+    try:
+        ipaddress.ip_address(ip)
+        return True
+    except ValueError:
+        return False
 
+def _split_indicators(data):
+    """Return (ips, hashes, invalid_ips), deduplicated in first-seen order."""
+    ips = []
+    invalid = []
+    for ip in dict.fromkeys(data.get("ips", [])):
+        (ips if isinstance(ip, str) and _is_valid_ip(ip) else invalid).append(ip)
+    return ips, list(dict.fromkeys(data.get("hashes", []))), invalid
+
+
+@_intel_cached("virustotal")
 def vt_file_hash(hash):
     if not VT_API_KEY:
-        return {"error": "VirusTotal API key not set"}
+        return None, {"error": "VirusTotal API key not set"}
     try:
         url = f"https://www.virustotal.com/api/v3/files/{hash}"
         headers = {"x-apikey": VT_API_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        return r.json()
+        r = _SESSION.get(url, headers=headers, timeout=10)
+        return r.status_code, r.json()
     except Exception as e:
-        return {"error": str(e)}
+        return None, {"error": str(e)}
 
+@_intel_cached("otx")
 def otx_ip(ip):
     if not OTX_API_KEY:
-        return {"error": "OTX API key not set"}
+        return None, {"error": "OTX API key not set"}
     try:
         url = f"https://otx.alienvault.com/api/v1/indicators/IPv4/{ip}/general"
         headers = {"X-OTX-API-KEY": OTX_API_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        return r.json()
+        r = _SESSION.get(url, headers=headers, timeout=10)
+        return r.status_code, r.json()
     except Exception as e:
-        return {"error": str(e)}
+        return None, {"error": str(e)}
 
+@_intel_cached("abuseipdb")
 def abuseipdb_ip(ip):
     if not ABUSEIPDB_API_KEY:
-        return {"error": "AbuseIPDB API key not set"}
+        return None, {"error": "AbuseIPDB API key not set"}
     try:
         url = f"https://api.abuseipdb.com/api/v2/check"
         headers = {"Key": ABUSEIPDB_API_KEY, "Accept": "application/json"}
         params = {"ipAddress": ip, "maxAgeInDays": 90}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        return r.json()
+        r = _SESSION.get(url, headers=headers, params=params, timeout=10)
+        return r.status_code, r.json()
     except Exception as e:
-        return {"error": str(e)}
+        return None, {"error": str(e)}
 
+@_intel_cached("shodan")
 def shodan_ip(ip):
     if not SHODAN_API_KEY:
-        return {"error": "Shodan API key not set"}
+        return None, {"error": "Shodan API key not set"}
     try:
         url = f"https://api.shodan.io/shodan/host/{ip}?key={SHODAN_API_KEY}"
-        r = requests.get(url, timeout=10)
-        return r.json()
+        r = _SESSION.get(url, timeout=10)
+        return r.status_code, r.json()
     except Exception as e:
-        return {"error": str(e)}
+        return None, {"error": str(e)}
 
 def collect_threat_intel_logs(log_dirs=["/var/log"], max_lines=MAX_LINES):
-    logs = {}
-    keywords = ["threat", "intel", "virustotal", "otx", "abuseipdb", "shodan"]
-    for log_dir in log_dirs:
-        for ext in [".log", ".err", ".out", ".journal"]:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                if any(kw in log_file.lower() for kw in keywords):
-                    try:
-                        with open(log_file, 'r', errors='ignore') as f:
-                            lines = f.readlines()[-max_lines:]
-                            logs[log_file] = ''.join(lines)
-                    except Exception as e:
-                        logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, path_filter=_is_threat_intel_log), max_lines)
 
 def collect_threat_intel_journalctl(lines=200):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-g', 'threat', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, grep='threat')
         return output
     except Exception as e:
         return f"error: {e}"
 
+# Long-lived aiohttp session for the async path, bound to the loop that created it
+_AIO_SESSION = None
+_AIO_SESSION_LOOP = None
+
+def _new_aio_session():
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=INTEL_TIMEOUT),
+        connector=aiohttp.TCPConnector(limit=INTEL_CONCURRENCY),
+    )
+
+def _get_aio_session():
+    global _AIO_SESSION, _AIO_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _AIO_SESSION is None or _AIO_SESSION.closed or _AIO_SESSION_LOOP is not loop:
+        _AIO_SESSION = _new_aio_session()
+        _AIO_SESSION_LOOP = loop
+    return _AIO_SESSION
+
+async def _get_json(session, sem, url, headers=None, params=None):
+    async with sem:
+        try:
+            async with session.get(url, headers=headers, params=params) as r:
+                return r.status, await r.json(content_type=None)
+        except Exception as e:
+            return None, {"error": str(e)}
+
+@_intel_cached("virustotal")
+async def vt_file_hash_async(session, sem, hash):
+    if not VT_API_KEY:
+        return None, {"error": "VirusTotal API key not set"}
+    url = f"https://www.virustotal.com/api/v3/files/{hash}"
+    return await _get_json(session, sem, url, headers={"x-apikey": VT_API_KEY})
+
+@_intel_cached("otx")
+async def otx_ip_async(session, sem, ip):
+    if not OTX_API_KEY:
+        return None, {"error": "OTX API key not set"}
+    url = f"https://otx.alienvault.com/api/v1/indicators/IPv4/{ip}/general"
+    return await _get_json(session, sem, url, headers={"X-OTX-API-KEY": OTX_API_KEY})
+
+@_intel_cached("abuseipdb")
+async def abuseipdb_ip_async(session, sem, ip):
+    if not ABUSEIPDB_API_KEY:
+        return None, {"error": "AbuseIPDB API key not set"}
+    headers = {"Key": ABUSEIPDB_API_KEY, "Accept": "application/json"}
+    params = {"ipAddress": ip, "maxAgeInDays": 90}
+    return await _get_json(session, sem, "https://api.abuseipdb.com/api/v2/check", headers=headers, params=params)
+
+@_intel_cached("shodan")
+async def shodan_ip_async(session, sem, ip):
+    if not SHODAN_API_KEY:
+        return None, {"error": "Shodan API key not set"}
+    return await _get_json(session, sem, f"https://api.shodan.io/shodan/host/{ip}?key={SHODAN_API_KEY}")
+
+# Providers with an API key, fixed at import: name -> (sync lookup, async lookup).
+# Disabled providers never reach the per-indicator loops.
+IP_PROVIDERS = {name: fns for name, fns, key in [
+    ("otx", (otx_ip, otx_ip_async), OTX_API_KEY),
+    ("abuseipdb", (abuseipdb_ip, abuseipdb_ip_async), ABUSEIPDB_API_KEY),
+    ("shodan", (shodan_ip, shodan_ip_async), SHODAN_API_KEY),
+] if key}
+HASH_PROVIDERS = {name: fns for name, fns, key in [
+    ("virustotal", (vt_file_hash, vt_file_hash_async), VT_API_KEY),
+] if key}
+
+async def _lookup(session, sem, indicator, providers):
+    """All enabled providers for one indicator, concurrently."""
+    responses = await asyncio.gather(*[lookup(session, sem, indicator) for _, lookup in providers.values()])
+    return dict(zip(providers, responses))
+
+async def _enrich_async(data, session):
+    result = {"timestamp": datetime.utcnow().isoformat(), "intel": {}, "logs": {}, "journalctl": ""}
+    # Example: data = {"ips": [...], "hashes": [...], "domains": [...]}
+    ips, hashes, invalid = _split_indicators(data)
+    sem = asyncio.Semaphore(INTEL_CONCURRENCY)
+    targets = [(ip, IP_PROVIDERS) for ip in ips if IP_PROVIDERS]
+    targets += [(h, HASH_PROVIDERS) for h in hashes if HASH_PROVIDERS]
+    # Every (indicator, provider) lookup and the local log reads are in flight together
+    intel, logs, journal = await asyncio.gather(
+        asyncio.gather(*[_lookup(session, sem, indicator, providers) for indicator, providers in targets]),
+        asyncio.to_thread(collect_threat_intel_logs),
+        asyncio.to_thread(collect_threat_intel_journalctl),
+    )
+    result["intel"] = dict(zip([indicator for indicator, _ in targets], intel))
+    for ip in invalid:
+        result["intel"][ip] = {"error": "invalid IP address"}
+    result["logs"] = logs
+    result["journalctl"] = journal
+    return result
+
+async def enrich_with_threat_intel_async(data):
+    """
+    Async variant of enrich_with_threat_intel() for callers already running an event loop.
+    Falls back to the sync lookups in a worker thread when aiohttp is missing.
+    """
+    if not AIOHTTP_AVAILABLE:
+        return await asyncio.to_thread(enrich_with_threat_intel, data)
+    return await _enrich_async(data, _get_aio_session())
+
+async def _enrich_once(data):
+    # asyncio.run() closes its loop afterwards, so use a session scoped to this run
+    async with _new_aio_session() as session:
+        return await _enrich_async(data, session)
+
 def enrich_with_threat_intel(data):
     """
     Enrich IPs/domains/files with threat intelligence lookups (VirusTotal, OTX, AbuseIPDB, Shodan).
     Collect logs related to threat intel from /var/log and journalctl.
     Returns a dict.
     """
+    if AIOHTTP_AVAILABLE:
+        return asyncio.run(_enrich_once(data))
     result = {"timestamp": datetime.utcnow().isoformat(), "intel": {}, "logs": {}, "journalctl": ""}
-    # Example: data = {"ips": [...], "hashes": [...], "domains": [...]}
-    ips = data.get("ips", [])
-    hashes = data.get("hashes", [])
+    ips, hashes, invalid = _split_indicators(data)
     # IP enrichment
-    for ip in ips:
-        result["intel"][ip] = {
-            "otx": otx_ip(ip),
-            "abuseipdb": abuseipdb_ip(ip),
-            "shodan": shodan_ip(ip)
-        }
+    if IP_PROVIDERS:
+        for ip in ips:
+            result["intel"][ip] = {name: lookup(ip) for name, (lookup, _) in IP_PROVIDERS.items()}
     # File hash enrichment
-    for h in hashes:
-        result["intel"][h] = {"virustotal": vt_file_hash(h)}
+    if HASH_PROVIDERS:
+        for h in hashes:
+            result["intel"][h] = {name: lookup(h) for name, (lookup, _) in HASH_PROVIDERS.items()}
+    for ip in invalid:
+        result["intel"][ip] = {"error": "invalid IP address"}
     # Logs
     result["logs"] = collect_threat_intel_logs()
     result["journalctl"] = collect_threat_intel_journalctl()
@@ -1,88 +1,176 @@
 import os
+import re
+import time
 import pwd
 import grp
 import psutil
 import platform
+import functools
 import subprocess
-import glob
 from datetime import datetime
 
+from ._journal import journal_tail
+from ._fsutil import list_log_files, read_log_tails, keyword_matcher
+
 MAX_LINES = 200
+USER_LOG_KEYWORDS = ["auth", "secure", "sudo", "sshd", "user", "group", "login", "logout"]
+_is_user_log = keyword_matcher(USER_LOG_KEYWORDS)
+
+# Environment is fixed for the agent's lifetime; resolve the host root once
+HOST_ROOT = os.getenv('HOST_ROOT', '/')
+MONITORING_HOST = HOST_ROOT != '/'
+SUDOERS_PATH = os.path.join(HOST_ROOT, 'etc/sudoers')
+CRON_PATH = os.path.join(HOST_ROOT, 'etc/crontab')
+
 
+WTMP_PATH = '/var/log/wtmp'
+UTMP_PATH = '/var/run/utmp'
+# argv -> (stat signature of the file it reads, output)
+_CMD_OUTPUT_CACHE = {}
+
+def _output_if_changed(argv, source_path):
+    """
+    Run argv, reusing the previous output while source_path (the utmp/wtmp file the
+    command reads) is unchanged. Falls back to always running when it cannot be stat'ed.
+    """
+    try:
+        st = os.stat(source_path)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        signature = None
+    key = tuple(argv)
+    cached = _CMD_OUTPUT_CACHE.get(key)
+    if signature is not None and cached is not None and cached[0] == signature:
+        return cached[1]
+    output = subprocess.check_output(argv, text=True)
+    _CMD_OUTPUT_CACHE[key] = (signature, output)
+    return output
 
 def collect_logged_in_users():
     try:
-        output = subprocess.check_output(['who'], text=True)
+        output = _output_if_changed(['who'], UTMP_PATH)
         return output
     except Exception as e:
         return f"error: {e}"
 
 def collect_last_logins():
     try:
-        output = subprocess.check_output(['last', '-n', '20'], text=True)
+        output = _output_if_changed(['last', '-n', '20'], WTMP_PATH)
         return output
     except Exception as e:
         return f"error: {e}"
 
-def collect_sudo_usage():
+AUTH_LOG_PATH = '/var/log/auth.log'
+_USER_GROUP_CHANGE_RE = re.compile(r'useradd|userdel|groupadd|groupdel')
+
+@functools.lru_cache(maxsize=1)
+def _scan_auth_log(path, mtime_ns, size):
+    """
+    Read auth.log once and split out the lines the three grep-style collectors want.
+    Keyed on (mtime_ns, size) so the collectors of one cycle share a single pass.
+    """
+    sudo, sshd, user_group = [], [], []
+    with open(path, errors='replace') as f:
+        for line in f:
+            # Plain substring tests for the literals; only the alternation needs a regex
+            if 'sudo' in line:
+                sudo.append(line)
+            if 'sshd' in line:
+                sshd.append(line)
+            if _USER_GROUP_CHANGE_RE.search(line):
+                user_group.append(line)
+    return {"sudo": ''.join(sudo), "sshd": ''.join(sshd), "user_group": ''.join(user_group)}
+
+def _auth_log_lines(kind):
     try:
-        if os.path.exists('/var/log/auth.log'):
-            output = subprocess.check_output(['grep', 'sudo', '/var/log/auth.log'], text=True)
-            return output
-        else:
-            return "auth.log not available"
+        st = os.stat(AUTH_LOG_PATH)
+    except FileNotFoundError:
+        return "auth.log not available"
     except Exception as e:
         return f"error: {e}"
-
-def collect_ssh_sessions():
     try:
-        if os.path.exists('/var/log/auth.log'):
-            output = subprocess.check_output(['grep', 'sshd', '/var/log/auth.log'], text=True)
-            return output
-        else:
-            return "auth.log not available"
+        return _scan_auth_log(AUTH_LOG_PATH, st.st_mtime_ns, st.st_size)[kind]
     except Exception as e:
         return f"error: {e}"
 
+def collect_sudo_usage():
+    return _auth_log_lines("sudo")
+
+def collect_ssh_sessions():
+    return _auth_log_lines("sshd")
+
 def collect_user_group_changes():
-    try:
-        if os.path.exists('/var/log/auth.log'):
-            output = subprocess.check_output(['grep', '-E', 'useradd|userdel|groupadd|groupdel', '/var/log/auth.log'], text=True)
-            return output
-        else:
-            return "auth.log not available"
-    except Exception as e:
-        return f"error: {e}"
+    return _auth_log_lines("user_group")
+
+ACCOUNT_CACHE_TTL = 60  # seconds
+ACCOUNT_FILES = ('/etc/passwd', '/etc/group')
+
+def _account_files_mtimes():
+    mtimes = []
+    for path in ACCOUNT_FILES:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+def _account_cache(fn):
+    """
+    Cache fn() for ACCOUNT_CACHE_TTL seconds, or until /etc/passwd or /etc/group changes.
+    getpwall()/getgrall() go through NSS, which may mean LDAP/SSSD round trips.
+    """
+    cache = {}
+
+    @functools.wraps(fn)
+    def wrapper():
+        now = time.monotonic()
+        mtimes = _account_files_mtimes()
+        if cache and cache["expires"] > now and cache["mtimes"] == mtimes:
+            return cache["value"]
+        value = fn()
+        cache.update(value=value, expires=now + ACCOUNT_CACHE_TTL, mtimes=mtimes)
+        return value
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+@_account_cache
+def _user_entries():
+    return [{
+        "name": user.pw_name,
+        "uid": user.pw_uid,
+        "gid": user.pw_gid,
+        "home": user.pw_dir,
+        "shell": user.pw_shell
+    } for user in pwd.getpwall()]
+
+@_account_cache
+def _users_by_name():
+    # Built once per cache period so each logged-in session is joined in O(1)
+    return {u["name"]: u for u in _user_entries()}
+
+@_account_cache
+def _group_entries():
+    return [{
+        "name": group.gr_name,
+        "gid": group.gr_gid,
+        "members": group.gr_mem
+    } for group in grp.getgrall()]
 
 def collect_users_groups():
     try:
-        users = [u.pw_name for u in pwd.getpwall()]
-        groups = [g.gr_name for g in grp.getgrall()]
+        users = [u["name"] for u in _user_entries()]
+        groups = [g["name"] for g in _group_entries()]
         return {"users": users, "groups": groups}
     except Exception as e:
         return {"error": str(e)}
 
 def collect_user_logs(log_dirs=["/var/log"], max_lines=MAX_LINES):
-    logs = {}
-    keywords = ["auth", "secure", "sudo", "sshd", "user", "group", "login", "logout"]
-    for log_dir in log_dirs:
-        for ext in [".log", ".err", ".out", ".journal"]:
-            pattern = os.path.join(log_dir, f"*{ext}")
-            for log_file in glob.glob(pattern):
-                if any(kw in log_file.lower() for kw in keywords):
-                    try:
-                        with open(log_file, 'r', errors='ignore') as f:
-                            lines = f.readlines()[-max_lines:]
-                            logs[log_file] = ''.join(lines)
-                    except Exception as e:
-                        logs[log_file] = f"error: {e}"
-    return logs
+    return read_log_tails(list_log_files(log_dirs, path_filter=_is_user_log), max_lines)
 
 def collect_user_journalctl(lines=200):
     try:
-        output = subprocess.check_output([
-            'journalctl', '-g', 'user', '-n', str(lines), '--no-pager', '--output', 'short-iso'
-        ], text=True)
+        output = journal_tail(lines, grep='user')
         return output
     except Exception as e:
         return f"error: {e}"
@@ -93,21 +181,25 @@ def collect_user_activity():
     Returns a dict.
     """
     try:
-        # Check if we're monitoring host system
-        host_root = os.getenv('HOST_ROOT', '/')
-        monitoring_host = host_root != '/'
         current_os = platform.system().lower()
         
         # Get logged in users (works on all platforms)
         logged_users = []
         try:
+            try:
+                users_by_name = _users_by_name()
+            except Exception:
+                users_by_name = {}
             for user in psutil.users():
+                account = users_by_name.get(user.name, {})
                 logged_users.append({
                     "name": user.name,
                     "terminal": user.terminal,
                     "host": user.host,
                     "started": datetime.fromtimestamp(user.started).isoformat(),
-                    "pid": user.pid
+                    "pid": user.pid,
+                    "uid": account.get("uid"),
+                    "shell": account.get("shell")
                 })
         except Exception as e:
             logged_users = [{"error": f"Could not get logged users: {str(e)}"}]
@@ -119,25 +211,13 @@ def collect_user_activity():
         if current_os in ["linux", "darwin"]:  # Linux and macOS
             try:
                 # Get all users (Unix-style)
-                for user in pwd.getpwall():
-                    all_users.append({
-                        "name": user.pw_name,
-                        "uid": user.pw_uid,
-                        "gid": user.pw_gid,
-                        "home": user.pw_dir,
-                        "shell": user.pw_shell
-                    })
+                all_users = _user_entries()
             except Exception as e:
                 all_users = [{"error": f"Could not get users: {str(e)}"}]
             
             try:
                 # Get all groups (Unix-style)
-                for group in grp.getgrall():
-                    all_groups.append({
-                        "name": group.gr_name,
-                        "gid": group.gr_gid,
-                        "members": group.gr_mem
-                    })
+                all_groups = _group_entries()
             except Exception as e:
                 all_groups = [{"error": f"Could not get groups: {str(e)}"}]
         
@@ -157,10 +237,7 @@ def collect_user_activity():
         
         if current_os in ["linux", "darwin"]:
             # Check sudoers file (Unix systems)
-            sudoers_path = '/etc/sudoers'
-            if monitoring_host:
-                sudoers_path = os.path.join(host_root, 'etc/sudoers')
-            
+            sudoers_path = SUDOERS_PATH
             if os.path.exists(sudoers_path):
                 try:
                     stat = os.stat(sudoers_path)
@@ -184,9 +261,7 @@ def collect_user_activity():
             
             # Check cron jobs (Unix systems)
             try:
-                cron_paths = ['/etc/crontab']
-                if monitoring_host:
-                    cron_paths = [os.path.join(host_root, 'etc/crontab')]
+                cron_paths = [CRON_PATH]
                 
                 for cron_path in cron_paths:
                     if os.path.exists(cron_path):
@@ -219,8 +294,8 @@ def collect_user_activity():
             "all_groups": all_groups,
             "sudoers": sudoers_info,
             "cron_jobs": cron_jobs,
-            "monitoring_host": monitoring_host,
-            "host_root": host_root,
+            "monitoring_host": MONITORING_HOST,
+            "host_root": HOST_ROOT,
             "platform_type": current_os
         }
     except Exception as e:
@@ -5,3 +5,7 @@ AGENT_ID = os.getenv("AGENT_ID", os.uname().nodename)
 INTERVAL = int(os.getenv("AGENT_INTERVAL", 10))  # seconds
 SEND_MODE = os.getenv("SEND_MODE", "rest")  # "rest" or "websocket"
 WS_URL = os.getenv("WS_URL", "ws://server:8000/ws")
+SERVER_BATCH_URL = os.getenv("SERVER_BATCH_URL", SERVER_URL.rstrip("/") + "/batch")
+BATCH_SIZE = int(os.getenv("AGENT_BATCH_SIZE", 1))  # events per send; 1 disables batching
+BATCH_MAX_AGE = int(os.getenv("AGENT_BATCH_MAX_AGE", INTERVAL * BATCH_SIZE))  # seconds before a partial batch is flushed
+COMPRESSION = os.getenv("AGENT_COMPRESSION", "none")  # "zstd" (server needs zstandard) or "none"; REST bodies only
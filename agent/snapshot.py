@@ -1,9 +1,54 @@
 import os
+import json
+import heapq
 import subprocess
 import time
+import threading
 import psutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from collectors.system import _cpu_times_split, _cpu_percent_between
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+SNAPSHOT_PROCESSES = 3  # top processes that get lsof + gcore
+PROC_CACHE_SIZE = 512
+PROC_CACHE_TTL = 5  # seconds
+# pid -> (psutil.Process, expiry); reusing the object keeps cpu_percent() meaningful between calls
+_PROC_CACHE = OrderedDict()
+_PROC_CACHE_LOCK = threading.Lock()
+
+CPU_SAMPLE_MIN_INTERVAL = 0.25  # seconds; shorter windows are too noisy to report
+CPU_SAMPLE_MAX_AGE = 5  # seconds; an older baseline would average over long-past load
+
+# (monotonic time, (total, busy)) of the previous sample, primed at import
+_prev_cpu_sample = (time.monotonic(), _cpu_times_split())
+_prev_cpu_lock = threading.Lock()
+
+def _cpu_percent_recent():
+    """
+    System CPU utilisation over the last CPU_SAMPLE_MIN_INTERVAL..CPU_SAMPLE_MAX_AGE
+    seconds. Reuses the previous snapshot's sample when it is recent enough; otherwise
+    takes a fresh CPU_SAMPLE_MIN_INTERVAL sample instead of the old 1s blocking one.
+    """
+    global _prev_cpu_sample
+    with _prev_cpu_lock:
+        started, prev = _prev_cpu_sample
+        if time.monotonic() - started > CPU_SAMPLE_MAX_AGE:
+            started, prev = time.monotonic(), _cpu_times_split()
+        remaining = CPU_SAMPLE_MIN_INTERVAL - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        cur = _cpu_times_split()
+        _prev_cpu_sample = (time.monotonic(), cur)
+    return _cpu_percent_between(prev, cur)
+
 def take_memory_snapshot(pid):
     """Take a memory snapshot of a process using gcore."""
     try:
@@ -48,6 +93,20 @@ def take_memory_snapshot(pid):
     except Exception as e:
         return {"error": str(e), "pid": pid}
 
+LINE_COUNT_BLOCK = 1 << 20
+
+def _count_lines(path):
+    """Count lines like len(text.splitlines()) for newline-terminated output, reading in 1 MiB blocks."""
+    count = 0
+    last = b''
+    with open(path, 'rb') as f:
+        while block := f.read(LINE_COUNT_BLOCK):
+            count += block.count(b'\n')
+            last = block
+    if last and not last.endswith(b'\n'):
+        count += 1
+    return count
+
 def collect_lsof(pid=None):
     """Collect lsof information for a specific process or all processes."""
     try:
@@ -65,25 +124,16 @@ def collect_lsof(pid=None):
         if pid:
             # Collect lsof for specific process
             lsof_file = f"{snapshot_dir}/lsof_{pid}_{timestamp}.txt"
-            result = subprocess.run(
-                ['lsof', '-p', str(pid)],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            cmd, timeout = ['lsof', '-p', str(pid)], 10
         else:
             # Collect lsof for all processes
             lsof_file = f"{snapshot_dir}/lsof_all_{timestamp}.txt"
-            result = subprocess.run(
-                ['lsof'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            cmd, timeout = ['lsof'], 30
         
-        # Save output to file
-        with open(lsof_file, 'w') as f:
-            f.write(result.stdout)
+        # lsof writes straight into the file; its output (tens of MB for all
+        # processes) never passes through Python memory
+        with open(lsof_file, 'wb') as f:
+            result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, timeout=timeout)
         
         if result.returncode == 0:
             return {
@@ -91,13 +141,13 @@ def collect_lsof(pid=None):
                 "pid": pid,
                 "lsof_file": lsof_file,
                 "timestamp": timestamp,
-                "line_count": len(result.stdout.splitlines())
+                "line_count": _count_lines(lsof_file)
             }
         else:
             return {
                 "status": "error",
                 "pid": pid,
-                "error": result.stderr,
+                "error": result.stderr.decode(errors='replace'),
                 "returncode": result.returncode
             }
             
@@ -106,29 +156,66 @@ def collect_lsof(pid=None):
     except Exception as e:
         return {"error": str(e), "pid": pid}
 
-def get_process_info(pid):
-    """Get detailed information about a process."""
-    try:
+def _get_proc(pid):
+    """Return a cached psutil.Process for pid, rebuilt after PROC_CACHE_TTL or if the pid was reused."""
+    now = time.monotonic()
+    with _PROC_CACHE_LOCK:
+        hit = _PROC_CACHE.get(pid)
+        if hit is not None and hit[1] > now and hit[0].is_running():
+            _PROC_CACHE.move_to_end(pid)
+            return hit[0]
         process = psutil.Process(pid)
-        return {
-            "pid": pid,
-            "name": process.name(),
-            "cmdline": process.cmdline(),
-            "cpu_percent": process.cpu_percent(),
-            "memory_percent": process.memory_percent(),
-            "memory_info": process.memory_info()._asdict(),
-            "status": process.status(),
-            "create_time": process.create_time(),
-            "num_threads": process.num_threads(),
-            "connections": [conn._asdict() for conn in process.connections()],
-            "open_files": [f.path for f in process.open_files()],
-            "environ": dict(process.environ())
-        }
+        _PROC_CACHE[pid] = (process, now + PROC_CACHE_TTL)
+        _PROC_CACHE.move_to_end(pid)
+        while len(_PROC_CACHE) > PROC_CACHE_SIZE:
+            _PROC_CACHE.popitem(last=False)
+        return process
+
+def get_process_info(pid, *, include_env=False, include_open_files=False, include_connections=True):
+    """
+    Get detailed information about a process.
+    environ (a multi-KB /proc/<pid>/environ parse) and open_files (a readlink per fd)
+    are opt-in; connections are on by default.
+    """
+    try:
+        process = _get_proc(pid)
+        # oneshot() serves name/status/memory/threads/create_time from one stat/status parse
+        with process.oneshot():
+            info = {
+                "pid": pid,
+                "name": process.name(),
+                "cmdline": process.cmdline(),
+                "cpu_percent": process.cpu_percent(),
+                "memory_percent": process.memory_percent(),
+                "memory_info": process.memory_info()._asdict(),
+                "status": process.status(),
+                "create_time": process.create_time(),
+                "num_threads": process.num_threads(),
+            }
+            if include_connections:
+                info["connections"] = [conn._asdict() for conn in process.connections()]
+            if include_open_files:
+                info["open_files"] = [f.path for f in process.open_files()]
+            if include_env:
+                info["environ"] = dict(process.environ())
+            return info
     except psutil.NoSuchProcess:
         return {"error": f"Process {pid} not found"}
     except Exception as e:
         return {"error": str(e), "pid": pid}
 
+def _snapshot_default(obj):
+    # Match json.dumps(default=str): namedtuples become lists, anything else its str()
+    if isinstance(obj, tuple):
+        return list(obj)
+    return str(obj)
+
+def _dump_snapshot(data):
+    """Serialize a snapshot to indented UTF-8 JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=_snapshot_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
 def collect_system_snapshot():
     """Collect a comprehensive system snapshot."""
     try:
@@ -140,7 +227,7 @@ def collect_system_snapshot():
             "timestamp": timestamp,
             "system_info": {
                 "cpu_count": psutil.cpu_count(),
-                "cpu_percent": psutil.cpu_percent(interval=1),
+                "cpu_percent": _cpu_percent_recent(),
                 "memory": psutil.virtual_memory()._asdict(),
                 "disk": psutil.disk_usage('/')._asdict(),
                 "network": psutil.net_io_counters()._asdict()
@@ -149,7 +236,8 @@ def collect_system_snapshot():
             "snapshots": {}
         }
         
-        # Get top processes by memory usage
+        # Get top processes by memory usage. process_iter() reuses its cached Process
+        # objects, so cpu_percent is the delta since the previous snapshot.
         processes = []
         for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']):
             try:
@@ -157,24 +245,31 @@ def collect_system_snapshot():
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
         
-        # Sort by memory usage and get top 10
-        top_processes = sorted(processes, key=lambda x: x.get('memory_percent', 0), reverse=True)[:10]
+        # Top 10 by memory usage without sorting every process; memory_percent is
+        # None when access was denied
+        top_processes = heapq.nlargest(10, processes, key=lambda x: x.get('memory_percent') or 0.0)
         snapshot_data["processes"] = top_processes
         
-        # Take snapshots of top processes
-        for proc in top_processes[:3]:  # Top 3 processes
-            pid = proc['pid']
-            snapshot_data["snapshots"][f"process_{pid}"] = {
-                "info": proc,
-                "lsof": collect_lsof(pid),
-                "memory": take_memory_snapshot(pid)
-            }
+        # Take snapshots of top processes. Every lsof and gcore is an independent child
+        # process (up to 10s/30s each), so all of them run at once: wall time is the
+        # slowest one rather than the sum.
+        targets = top_processes[:SNAPSHOT_PROCESSES]
+        with ThreadPoolExecutor(max_workers=2 * max(1, len(targets))) as pool:
+            lsofs = [pool.submit(collect_lsof, proc['pid']) for proc in targets]
+            memories = [pool.submit(take_memory_snapshot, proc['pid']) for proc in targets]
+            for proc, lsof, memory in zip(targets, lsofs, memories):
+                snapshot_data["snapshots"][f"process_{proc['pid']}"] = {
+                    "info": proc,
+                    "lsof": lsof.result(),
+                    "memory": memory.result()
+                }
         
         # Save snapshot data
         snapshot_file = f"{snapshot_dir}/system_snapshot_{timestamp}.json"
-        import json
-        with open(snapshot_file, 'w') as f:
-            json.dump(snapshot_data, f, indent=2, default=str)
+        # Serialize first and write once; json.dump() issues a write per token
+        payload = _dump_snapshot(snapshot_data)
+        with open(snapshot_file, 'wb') as f:
+            f.write(payload)
         
         return {
             "status": "success",
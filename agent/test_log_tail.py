@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for the seek-from-end log tail reader.
+Compares tail_lines() against readlines()[-n:] on files that straddle the read block size.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the agent directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collectors import _fsutil
+
+
+def _check(content, n):
+    with tempfile.NamedTemporaryFile("wb", delete=False) as f:
+        f.write(content)
+        path = f.name
+    try:
+        with open(path, "r", errors="ignore") as f:
+            expected = f.readlines()[-n:]
+        assert _fsutil.tail_lines(path, n) == expected, (content[-80:], n)
+    finally:
+        os.unlink(path)
+
+
+def test_tail_matches_readlines():
+    lines = [f"line {i} " + "x" * (i % 37) for i in range(5000)]
+    content = "\n".join(lines).encode()
+    for n in (1, 10, 200, 6000):
+        _check(content, n)
+        _check(content + b"\n", n)
+
+
+def test_crlf_and_invalid_utf8():
+    content = b"first\r\nsecond\r\n\xff\xfebroken\r\nlast"
+    for n in (1, 2, 3, 10):
+        _check(content, n)
+
+
+def test_empty_file():
+    _check(b"", 5)
+
+
+def main():
+    original_block = _fsutil.TAIL_BLOCK_SIZE
+    try:
+        for block in (original_block, 7):
+            _fsutil.TAIL_BLOCK_SIZE = block
+            for test in (test_tail_matches_readlines, test_crlf_and_invalid_utf8, test_empty_file):
+                test()
+                print(f"  ✅ {test.__name__} (block={block})")
+    finally:
+        _fsutil.TAIL_BLOCK_SIZE = original_block
+    print("All log tail tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the /proc fast path in the process collector.
+Builds a fake /proc tree so the stat parser can be checked without real processes.
+"""
+
+import os
+import sys
+import tempfile
+
+import psutil
+
+# Add the agent directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collectors import process
+
+STARTTIME_TICKS = 4242
+
+
+def _stat_line(pid, comm, ppid):
+    # pid (comm) state ppid pgrp session tty_nr tpgid flags minflt cminflt majflt cmajflt
+    # utime stime cutime cstime priority nice num_threads itrealvalue starttime ...
+    rest = [str(ppid)] + ["0"] * 17 + [str(STARTTIME_TICKS), "0", "0"]
+    return f"{pid} ({comm}) S {' '.join(rest)}\n".encode()
+
+
+def _make_proc_entry(root, pid, comm, ppid, cmdline=b"", exe_target=None, exe_file=False):
+    base = os.path.join(root, str(pid))
+    os.makedirs(base)
+    with open(os.path.join(base, "stat"), "wb") as f:
+        f.write(_stat_line(pid, comm, ppid))
+    with open(os.path.join(base, "cmdline"), "wb") as f:
+        f.write(cmdline)
+    with open(os.path.join(base, "status"), "wb") as f:
+        f.write(f"Name:\t{comm}\nUid:\t{os.getuid()}\t{os.getuid()}\t{os.getuid()}\t{os.getuid()}\n".encode())
+    if exe_target:
+        os.symlink(exe_target, os.path.join(base, "exe"))
+    elif exe_file:
+        # readlink() on a regular file fails with EINVAL, like an unreadable exe link
+        open(os.path.join(base, "exe"), "w").close()
+
+
+def _collect(root):
+    return {p["pid"]: p for p in process._fast_process_iter(proc_root=root)}
+
+
+def test_comm_with_spaces_and_parens():
+    with tempfile.TemporaryDirectory() as root:
+        _make_proc_entry(root, 100, "evil) (name", 1, b"/usr/bin/evil\0--flag\0", exe_target="/usr/bin/evil")
+        procs = _collect(root)
+        info = procs[100]
+        assert info["name"] == "evil) (name"
+        assert info["ppid"] == 1
+        assert info["cmdline"] == ["/usr/bin/evil", "--flag"]
+        assert info["exe"] == "/usr/bin/evil"
+        expected = psutil.boot_time() + STARTTIME_TICKS / process._CLK_TCK
+        assert abs(info["create_time"] - expected) < 1e-6
+
+
+def test_kernel_thread_has_empty_exe():
+    with tempfile.TemporaryDirectory() as root:
+        _make_proc_entry(root, 2, "kthreadd", 0)
+        info = _collect(root)[2]
+        assert info["exe"] == ""
+        assert info["cmdline"] == []
+
+
+def test_kernel_threads_detected():
+    with tempfile.TemporaryDirectory() as root:
+        _make_proc_entry(root, 2, "kthreadd", 0)
+        _make_proc_entry(root, 7, "kworker/0:1", 2)
+        _make_proc_entry(root, 1, "init", 0, b"/sbin/init\0", exe_target="/sbin/init")
+        procs = _collect(root)
+        assert process._is_kernel_thread(procs[2])
+        assert process._is_kernel_thread(procs[7])
+        assert not process._is_kernel_thread(procs[1])
+
+
+def test_unreadable_exe_is_none():
+    with tempfile.TemporaryDirectory() as root:
+        _make_proc_entry(root, 300, "locked", 1, b"locked\0", exe_file=True)
+        assert _collect(root)[300]["exe"] is None
+
+
+def test_truncated_comm_expanded_from_cmdline():
+    with tempfile.TemporaryDirectory() as root:
+        _make_proc_entry(root, 400, "very-long-daemo", 1, b"/opt/bin/very-long-daemon-name\0")
+        assert _collect(root)[400]["name"] == "very-long-daemon-name"
+
+
+def test_non_pid_entries_skipped():
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "self"))
+        _make_proc_entry(root, 500, "sh", 1, b"sh\0")
+        assert list(_collect(root)) == [500]
+
+
+def test_deep_inspection_only_for_new_or_unhashed():
+    seen = {(10, 1.0), (11, 2.0)}
+    assert not process._needs_deep_inspection({"pid": 10, "create_time": 1.0, "exe": "/bin/sh", "sha256": "ab"}, seen)
+    # pid reused by a new process
+    assert process._needs_deep_inspection({"pid": 11, "create_time": 3.0, "exe": "/bin/sh", "sha256": "ab"}, seen)
+    assert process._needs_deep_inspection({"pid": 12, "create_time": 1.0, "exe": "/bin/sh", "sha256": "ab"}, seen)
+    # binary deleted or unreadable
+    assert process._needs_deep_inspection({"pid": 10, "create_time": 1.0, "exe": "/tmp/x (deleted)", "sha256": None}, seen)
+
+
+def main():
+    tests = [
+        test_comm_with_spaces_and_parens,
+        test_kernel_thread_has_empty_exe,
+        test_kernel_threads_detected,
+        test_unreadable_exe_is_none,
+        test_truncated_comm_expanded_from_cmdline,
+        test_non_pid_entries_skipped,
+        test_deep_inspection_only_for_new_or_unhashed,
+    ]
+    for test in tests:
+        test()
+        print(f"  ✅ {test.__name__}")
+    print("All process collector tests passed")
+
+
+if __name__ == "__main__":
+    main()
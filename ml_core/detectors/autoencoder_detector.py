@@ -2,6 +2,7 @@ import torch
 import numpy as np
 import sys
 import os
+import warnings
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,6 +15,8 @@ except ImportError:
     except ImportError:
         from models.autoencoder import AutoEncoder
 
+PREDICT_BATCH_SIZE = 4096  # rows per forward pass
+
 class AutoEncoderDetector:
     def __init__(self, model: AutoEncoder, threshold: float = None, device: str = None):
         self.model = model
@@ -21,34 +24,103 @@ class AutoEncoderDetector:
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
         self.model.eval()
+        # fp32 weights; self.model becomes an int8 copy after quantize()
+        self._float_model = model
+        self._quantized = False
+        self._on_cuda = str(self.device).startswith("cuda")
+        self._amp_dtype = None
+        if self._on_cuda:
+            # bf16 keeps fp32's exponent range, so no loss scaling; pre-Ampere cards get fp16
+            self._amp_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        self._fast_score = None
+        self._build_fast_score()
+
+    def _build_fast_score(self):
+        """
+        Prepare a faster path for compute_reconstruction_error. Rebuilt whenever the
+        weights change, since the CPU graph bakes them in as constants.
+        CUDA: torch.compile into CUDA graphs. CPU: a traced and frozen TorchScript graph,
+        which needs no compiler toolchain on the agent host.
+        """
+        self._fast_score = None
+        self.model.eval()
+        if self._on_cuda:
+            if hasattr(torch, "compile"):
+                # Compiles lazily on first use; the bound method keeps state_dict() keys unprefixed
+                self._fast_score = torch.compile(self.model.compute_reconstruction_error, mode="reduce-overhead")
+            return
+        if self._quantized:
+            return
+        try:
+            example = torch.zeros(1, self.model.input_dim, device=self.device)
+            with warnings.catch_warnings():
+                # jit.freeze is deprecated upstream; keep eager scoring if it goes away
+                warnings.simplefilter("ignore", FutureWarning)
+                traced = torch.jit.trace_module(self.model, {"compute_reconstruction_error": example})
+                frozen = torch.jit.freeze(traced, preserved_attrs=["compute_reconstruction_error"])
+            self._fast_score = frozen.compute_reconstruction_error
+        except Exception:
+            self._fast_score = None
 
     def fit(self, dataloader, trainer, epochs=10):
         for epoch in range(epochs):
             loss = trainer.train_epoch(dataloader)
         # Optionally compute threshold after training
         self.threshold = trainer.compute_threshold(dataloader)
+        self._build_fast_score()
 
-    def predict(self, X: np.ndarray):
+    def _errors(self, X: np.ndarray) -> np.ndarray:
+        """Per-row reconstruction MSE, scored in PREDICT_BATCH_SIZE chunks."""
         self.model.eval()
-        X_tensor = torch.tensor(X, dtype=torch.float32).to(self.device)
-        with torch.no_grad():
-            _, decoded = self.model(X_tensor)
-            errors = torch.mean((X_tensor - decoded) ** 2, dim=1).cpu().numpy()
+        # from_numpy shares the array's memory instead of copying element by element
+        X_tensor = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+        on_cuda = self._on_cuda
+        if on_cuda:
+            # Page-locked host memory lets the copy to the GPU overlap with compute
+            X_tensor = X_tensor.pin_memory()
+        score = self._fast_score or self.model.compute_reconstruction_error
+        errors = []
+        # Inputs stay fp32; autocast runs the Linear layers in half precision on CUDA
+        with torch.inference_mode(), torch.autocast(device_type="cuda", dtype=self._amp_dtype,
+                                                    enabled=self._amp_dtype is not None):
+            for start in range(0, len(X_tensor), PREDICT_BATCH_SIZE):
+                chunk = X_tensor[start:start + PREDICT_BATCH_SIZE].to(self.device, non_blocking=on_cuda)
+                # Copy out as fp32: CUDA graph replays reuse their output buffers
+                errors.append(score(chunk).to(torch.float32, copy=True))
+        if not errors:
+            return np.empty(0, dtype=np.float32)
+        return torch.cat(errors).cpu().numpy()
+
+    def predict(self, X: np.ndarray):
+        errors = self._errors(X)
         if self.threshold is not None:
             return (errors > self.threshold).astype(int)
         return errors
 
     def anomaly_score(self, X: np.ndarray):
-        self.model.eval()
-        X_tensor = torch.tensor(X, dtype=torch.float32).to(self.device)
-        with torch.no_grad():
-            _, decoded = self.model(X_tensor)
-            errors = torch.mean((X_tensor - decoded) ** 2, dim=1).cpu().numpy()
-        return errors
+        return self._errors(X)
+
+    def quantize(self):
+        """
+        Swap in an int8 dynamically quantized copy of the model for CPU scoring.
+        Opt-in: on small models without VNNI it can be slower than fp32, so measure first.
+        """
+        if self._on_cuda:
+            raise ValueError("int8 dynamic quantization is only supported on CPU")
+        self._float_model.eval()
+        self.model = torch.ao.quantization.quantize_dynamic(self._float_model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._quantized = True
+        self._build_fast_score()
+        return self
 
     def save(self, filepath: str):
-        torch.save(self.model.state_dict(), filepath)
+        # Always the fp32 weights, so the file loads into a plain AutoEncoder
+        torch.save(self._float_model.state_dict(), filepath)
 
     def load(self, filepath: str):
-        self.model.load_state_dict(torch.load(filepath, map_location=self.device))
-        self.model.to(self.device) 
\ No newline at end of file
+        self._float_model.load_state_dict(torch.load(filepath, map_location=self.device))
+        self._float_model.to(self.device)
+        if self._quantized:
+            self.quantize()
+        else:
+            self._build_fast_score() 
\ No newline at end of file
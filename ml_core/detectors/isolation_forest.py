@@ -2,8 +2,21 @@ from sklearn.ensemble import IsolationForest
 import numpy as np
 import joblib
 
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# skl2onnx's IsolationForest converter needs the ai.onnx.ml TreeEnsemble ops from opset 3
+ONNX_TARGET_OPSET = {'': 15, 'ai.onnx.ml': 3}
+
 class IsolationForestDetector:
-    def __init__(self, n_estimators=100, contamination=0.05, random_state=42, **kwargs):
+    def __init__(self, n_estimators=100, contamination=0.05, random_state=42, use_onnx=True, **kwargs):
+        # Trees are independent: fit and score them on every core unless the config says otherwise
+        kwargs.setdefault('n_jobs', -1)
         self.model = IsolationForest(
             n_estimators=n_estimators,
             contamination=contamination,
@@ -11,10 +24,44 @@ class IsolationForestDetector:
             **kwargs
         )
         self.is_fitted = False
+        self.use_onnx = use_onnx
+        self._onnx_session = None
+
+    def _compile(self):
+        """
+        Export the fitted forest to an ONNX Runtime session so anomaly_score evaluates
+        every tree in native code. Leaves the sklearn path in place if export fails.
+        """
+        self._onnx_session = None
+        if not (self.use_onnx and ONNX_AVAILABLE):
+            return
+        try:
+            onx = convert_sklearn(
+                self.model,
+                initial_types=[('X', FloatTensorType([None, self.model.n_features_in_]))],
+                target_opset=ONNX_TARGET_OPSET,
+            )
+            self._onnx_session = ort.InferenceSession(onx.SerializeToString(), providers=['CPUExecutionProvider'])
+        except Exception:
+            self._onnx_session = None
+
+    def __getstate__(self):
+        # InferenceSession is not picklable; it is rebuilt from the forest on unpickle
+        state = self.__dict__.copy()
+        state['_onnx_session'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('use_onnx', True)
+        self._onnx_session = None
+        if self.is_fitted:
+            self._compile()
 
     def fit(self, X: np.ndarray):
         self.model.fit(X)
         self.is_fitted = True
+        self._compile()
 
     def predict(self, X: np.ndarray):
         if not self.is_fitted:
@@ -24,6 +71,10 @@ class IsolationForestDetector:
     def anomaly_score(self, X: np.ndarray):
         if not self.is_fitted:
             raise RuntimeError("IsolationForest model is not fitted.")
+        if self._onnx_session is not None:
+            # "scores" is the converter's decision_function output, computed in float32
+            scores = self._onnx_session.run(['scores'], {'X': np.ascontiguousarray(X, dtype=np.float32)})[0]
+            return -scores.ravel()
         # Lower scores are more anomalous
         return -self.model.decision_function(X)
 
@@ -32,4 +83,5 @@ class IsolationForestDetector:
 
     def load(self, filepath: str):
         self.model = joblib.load(filepath)
-        self.is_fitted = True 
\ No newline at end of file
+        self.is_fitted = True
+        self._compile() 
\ No newline at end of file
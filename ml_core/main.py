@@ -1,17 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import asyncio
+import functools
 import logging
 try:
-    from ml_core.detectors import IsolationForestDetector, AutoEncoderDetector
     from ml_core.preprocessing import DataPreprocessor
-    from ml_core.utils import AnomalyScorer, ModelManager
-    from ml_core.models import AutoEncoder
+    from ml_core.utils import ModelManager
 except ImportError:
-    from detectors import IsolationForestDetector, AutoEncoderDetector
     from preprocessing import DataPreprocessor
-    from utils import AnomalyScorer, ModelManager
-    from models import AutoEncoder
+    from utils import ModelManager
 import numpy as np
 
 # Configure logging
@@ -22,7 +20,22 @@ app = FastAPI(title="NeuroSentinel ML Core", version="1.0.0")
 
 # Global instances
 model_manager = ModelManager()
-anomaly_scorer = AnomalyScorer()
+# Shared by the scoring endpoints; it holds no fitted state on this path
+_PREPROCESSOR = DataPreprocessor()
+
+@functools.cache
+def _get_detector_classes():
+    """
+    Import the detectors on first use: torch alone adds over a second to worker boot,
+    and only /train constructs detectors (loaded models bring their own imports).
+    """
+    try:
+        from ml_core.detectors import IsolationForestDetector, AutoEncoderDetector
+        from ml_core.models import AutoEncoder
+    except ImportError:
+        from detectors import IsolationForestDetector, AutoEncoderDetector
+        from models import AutoEncoder
+    return IsolationForestDetector, AutoEncoderDetector, AutoEncoder
 
 class TrainingRequest(BaseModel):
     model_type: str  # "isolation_forest" or "autoencoder"
@@ -32,6 +45,123 @@ class TrainingRequest(BaseModel):
 class PredictionRequest(BaseModel):
     data: Dict[str, Any]
     model_id: str = None
+    config: Dict[str, Any] = {}
+
+class PredictionBatchRequest(BaseModel):
+    data: List[Dict[str, Any]]
+    model_id: Optional[str] = None
+    config: Dict[str, Any] = {}
+
+# Micro-batching for the scoring endpoints
+BATCH_MAX_ROWS = 1024  # rows per anomaly_score call
+BATCH_WINDOW_MIN = 0.005  # seconds to wait for more requests once a backlog forms
+BATCH_WINDOW_MAX = 0.020  # ...and once the backlog reaches BATCH_BUSY_DEPTH
+BATCH_BUSY_DEPTH = 8
+BATCH_IDLE_TIMEOUT = 60  # seconds without requests before a model's batcher task exits
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests for one model into a single anomaly_score call.
+    A request that arrives to an empty queue is scored immediately; when requests are
+    already waiting, the batcher holds the batch open a few milliseconds longer (more
+    when the backlog is deep) so model load and launch costs are shared. After
+    BATCH_IDLE_TIMEOUT seconds without requests the task exits and unregisters itself.
+    """
+    
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.queue = asyncio.Queue()
+        self.task = None
+    
+    async def score(self, X: np.ndarray):
+        """
+        Returns (has_scores, values): anomaly scores when the model has anomaly_score,
+        otherwise its predict() labels (-1 = anomalous, the IsolationForest convention).
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, future))
+        return await future
+    
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        try:
+            items = [await asyncio.wait_for(self.queue.get(), BATCH_IDLE_TIMEOUT)]
+        except asyncio.TimeoutError:
+            return []
+        rows = len(items[0][0])
+        depth = self.queue.qsize()
+        if depth == 0:
+            return items
+        deadline = loop.time() + (BATCH_WINDOW_MAX if depth >= BATCH_BUSY_DEPTH else BATCH_WINDOW_MIN)
+        while rows < BATCH_MAX_ROWS:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items
+    
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            if not items:
+                # No await between this check and returning, so score() either sees the task done or queued before it
+                if self.queue.empty():
+                    if _BATCHERS.get(self.model_id) is self:
+                        del _BATCHERS[self.model_id]
+                    return
+                continue
+            try:
+                detector = await asyncio.to_thread(model_manager.load_model, self.model_id)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            # Samples can carry optional feature groups, so only equal-width rows share a call
+            by_width = {}
+            for item in items:
+                by_width.setdefault(item[0].shape[1], []).append(item)
+            has_scores = hasattr(detector, 'anomaly_score')
+            score_fn = detector.anomaly_score if has_scores else detector.predict
+            for group in by_width.values():
+                try:
+                    scores = await asyncio.to_thread(score_fn, np.vstack([X for X, _ in group]))
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                offset = 0
+                for X, future in group:
+                    if not future.done():
+                        future.set_result((has_scores, scores[offset:offset + len(X)]))
+                    offset += len(X)
+
+_BATCHERS: Dict[str, MicroBatcher] = {}
+
+def _batcher(model_id: str) -> MicroBatcher:
+    if model_id not in _BATCHERS:
+        _BATCHERS[model_id] = MicroBatcher(model_id)
+    return _BATCHERS[model_id]
+
+def _resolve_model_id(model_id: Optional[str]) -> str:
+    if model_id is None:
+        # Use latest model
+        models = model_manager.list_models()
+        if not models:
+            raise HTTPException(status_code=404, detail="No models available")
+        model_id = models[-1]["id"]
+    # Unknown ids must not reach _batcher(), which would otherwise keep a batcher per id
+    if model_id not in model_manager.metadata["models"]:
+        raise HTTPException(status_code=404, detail=f"Model {model_id} not registered")
+    return model_id
 
 @app.get("/")
 def root():
@@ -50,19 +180,15 @@ async def train_model(request: TrainingRequest):
         preprocessor.fit_scalers(request.data)
         
         # Extract features
-        feature_vectors = []
-        for sample in request.data:
-            features = preprocessor.extract_features(sample)
-            X = preprocessor.normalize_features(features)
-            if X.size > 0:
-                feature_vectors.append(X.flatten())
-        
-        if not feature_vectors:
+        X_train = preprocessor.extract_features_batch(request.data)
+        
+        if X_train.size == 0:
             raise HTTPException(status_code=400, detail="No valid features extracted")
         
-        X_train = np.array(feature_vectors)
+        X_train = preprocessor.normalize_features_batch(X_train)
         
         # Create and train model
+        IsolationForestDetector, AutoEncoderDetector, AutoEncoder = _get_detector_classes()
         if request.model_type == "isolation_forest":
             detector = IsolationForestDetector(**request.config.get("params", {}))
             detector.fit(X_train)
@@ -92,42 +218,60 @@ async def train_model(request: TrainingRequest):
 async def predict_anomaly(request: PredictionRequest):
     """Predict anomaly for given data."""
     try:
-        if request.model_id is None:
-            # Use latest model
-            models = model_manager.list_models()
-            if not models:
-                raise HTTPException(status_code=404, detail="No models available")
-            request.model_id = models[-1]["id"]
-        
-        # Load model
-        detector = model_manager.load_model(request.model_id)
+        request.model_id = _resolve_model_id(request.model_id)
         
         # Preprocess data
-        preprocessor = DataPreprocessor()
-        features = preprocessor.extract_features(request.data)
-        X = preprocessor.normalize_features(features)
+        features = _PREPROCESSOR.extract_features(request.data)
+        X = _PREPROCESSOR.normalize_features(features)
         
         if X.size == 0:
             raise HTTPException(status_code=400, detail="No valid features extracted")
         
-        # Predict
-        if hasattr(detector, 'anomaly_score'):
-            score = detector.anomaly_score(X)
-            is_anomalous = score > request.config.get("threshold", 0.5)
+        # Predict; concurrent requests for the same model are scored together
+        has_scores, values = await _batcher(request.model_id).score(X)
+        if has_scores:
+            is_anomalous = values[0] > request.config.get("threshold", 0.5)
         else:
-            prediction = detector.predict(X)
-            is_anomalous = prediction[0] == -1  # IsolationForest convention
+            is_anomalous = values[0] == -1  # IsolationForest convention
         
         return {
             "model_id": request.model_id,
             "is_anomalous": bool(is_anomalous),
-            "anomaly_score": float(score[0]) if 'score' in locals() else None
+            "anomaly_score": float(values[0]) if has_scores else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict_batch")
+async def predict_anomaly_batch(request: PredictionBatchRequest):
+    """Predict anomalies for many samples with one model call."""
+    try:
+        model_id = _resolve_model_id(request.model_id)
+        
+        X = _PREPROCESSOR.normalize_features_batch(_PREPROCESSOR.extract_features_batch(request.data))
+        
+        if X.shape[0] != len(request.data):
+            raise HTTPException(status_code=400, detail="No valid features extracted for some samples")
+        
+        has_scores, values = await _batcher(model_id).score(X)
+        threshold = request.config.get("threshold", 0.5)
+        if has_scores:
+            results = [{"is_anomalous": bool(v > threshold), "anomaly_score": float(v)} for v in values]
+        else:
+            results = [{"is_anomalous": bool(v == -1), "anomaly_score": None} for v in values]
+        
+        return {"model_id": model_id, "results": results}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/models")
 async def list_models():
     """List all available models."""
@@ -1,5 +1,6 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import numpy as np
 from typing import Tuple, Optional, Dict, Any
@@ -109,7 +110,8 @@ class AutoEncoder(nn.Module):
             Reconstruction error tensor
         """
         encoded, decoded = self.forward(x)
-        return torch.mean(torch.square(x - decoded), dim=1)
+        # One fused elementwise kernel instead of separate subtract and square passes
+        return F.mse_loss(decoded, x, reduction='none').mean(dim=1)
     
     def predict_anomaly(self, x: torch.Tensor, threshold: float) -> torch.Tensor:
         """
@@ -1,7 +1,8 @@
+import time
 import numpy as np
-import pandas as pd
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, LabelEncoder
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 import hashlib
 import json
 from typing import Dict, List, Any, Tuple
@@ -9,6 +10,65 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Every sample gets exactly these features, in this order
+_FEATURE_DEFAULTS = {
+    # System metrics
+    'cpu_percent': 0.0,
+    'memory_percent': 0.0,
+    'disk_usage_percent': 0.0,
+    'load_average_1m': 0.0,
+    'load_average_5m': 0.0,
+    'load_average_15m': 0.0,
+    'boot_time': 0.0,
+    'uptime_hours': 0.0,
+    
+    # Process metrics
+    'total_processes': 0,
+    'unique_users': 0,
+    'avg_process_cpu': 0.0,
+    'avg_process_memory': 0.0,
+    'max_process_cpu': 0.0,
+    'max_process_memory': 0.0,
+    
+    # Network metrics
+    'total_connections': 0,
+    'established_connections': 0,
+    'listening_ports': 0,
+    'unique_remote_ips': 0,
+    
+    # File system metrics
+    'file_events_count': 0,
+    'file_creations': 0,
+    'file_modifications': 0,
+    'file_deletions': 0,
+    
+    # User activity metrics
+    'logged_in_users': 0,
+    'total_users': 0,
+    'total_groups': 0,
+    'recent_logins': 0,
+    
+    # Security metrics
+    'antivirus_running': 0,
+    'firewall_rules_count': 0,
+    'ids_alerts': 0,
+    'security_updates_pending': 0,
+    
+    # Container metrics
+    'running_containers': 0,
+    'total_containers': 0,
+    'container_cpu_usage': 0.0,
+    'container_memory_usage': 0.0,
+    
+    # Threat intelligence metrics
+    'threat_indicators': 0,
+    'high_risk_ips': 0,
+    'malware_detections': 0
+}
+FEATURE_ORDER = tuple(_FEATURE_DEFAULTS)
+FIT_CHUNK_SIZE = 4096  # samples extracted at a time while fitting scalers
+TEXT_HASH_FEATURES = 1024  # hashed n-gram columns per text feature
+
 class DataPreprocessor:
     """
     Preprocesses system monitoring data for ML anomaly detection.
@@ -20,70 +80,19 @@ class DataPreprocessor:
         self.scalers = {}
         self.label_encoders = {}
         self.tfidf_vectorizers = {}
-        self.feature_names = []
+        # extract_features always yields FEATURE_ORDER, so the names are known up front
+        self.feature_names = list(FEATURE_ORDER)
         
     def extract_features(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract numerical and categorical features from system data.
         Ensures consistent feature set for all samples.
         """
-        # Define expected features to ensure consistency
-        expected_features = {
-            # System metrics
-            'cpu_percent': 0.0,
-            'memory_percent': 0.0,
-            'disk_usage_percent': 0.0,
-            'load_average_1m': 0.0,
-            'load_average_5m': 0.0,
-            'load_average_15m': 0.0,
-            'boot_time': 0.0,
-            'uptime_hours': 0.0,
-            
-            # Process metrics
-            'total_processes': 0,
-            'unique_users': 0,
-            'avg_process_cpu': 0.0,
-            'avg_process_memory': 0.0,
-            'max_process_cpu': 0.0,
-            'max_process_memory': 0.0,
-            
-            # Network metrics
-            'total_connections': 0,
-            'established_connections': 0,
-            'listening_ports': 0,
-            'unique_remote_ips': 0,
-            
-            # File system metrics
-            'file_events_count': 0,
-            'file_creations': 0,
-            'file_modifications': 0,
-            'file_deletions': 0,
-            
-            # User activity metrics
-            'logged_in_users': 0,
-            'total_users': 0,
-            'total_groups': 0,
-            'recent_logins': 0,
-            
-            # Security metrics
-            'antivirus_running': 0,
-            'firewall_rules_count': 0,
-            'ids_alerts': 0,
-            'security_updates_pending': 0,
-            
-            # Container metrics
-            'running_containers': 0,
-            'total_containers': 0,
-            'container_cpu_usage': 0.0,
-            'container_memory_usage': 0.0,
-            
-            # Threat intelligence metrics
-            'threat_indicators': 0,
-            'high_risk_ips': 0,
-            'malware_detections': 0
-        }
-        
-        features = expected_features.copy()
+        return self._extract(data, time.time())
+    
+    def _extract(self, data: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """extract_features() against a caller-supplied epoch time, shared across a batch."""
+        features = _FEATURE_DEFAULTS.copy()
         
         # System metrics
         if 'system' in data:
@@ -96,7 +105,7 @@ class DataPreprocessor:
                 'load_average_5m': float(sys_data.get('load_average', [0, 0, 0])[1]),
                 'load_average_15m': float(sys_data.get('load_average', [0, 0, 0])[2]),
                 'boot_time': float(sys_data.get('boot_time', 0)),
-                'uptime_hours': float((pd.Timestamp.now().timestamp() - sys_data.get('boot_time', 0)) / 3600)
+                'uptime_hours': float((now - sys_data.get('boot_time', 0)) / 3600)
             })
         
         # Process metrics
@@ -104,35 +113,64 @@ class DataPreprocessor:
             proc_data = data['process']
             processes = proc_data.get('processes', [])
             if processes:
+                # One pass accumulating every statistic instead of a list per statistic
+                cpu_sum = mem_sum = 0.0
+                cpu_max = mem_max = float('-inf')
+                users = set()
+                for p in processes:
+                    cpu = p.get('cpu_percent', 0)
+                    mem = p.get('memory_percent', 0)
+                    cpu_sum += cpu
+                    mem_sum += mem
+                    if cpu > cpu_max:
+                        cpu_max = cpu
+                    if mem > mem_max:
+                        mem_max = mem
+                    users.add(p.get('username', ''))
                 features.update({
                     'total_processes': len(processes),
-                    'unique_users': len(set(p.get('username', '') for p in processes)),
-                    'avg_process_cpu': float(np.mean([p.get('cpu_percent', 0) for p in processes])),
-                    'avg_process_memory': float(np.mean([p.get('memory_percent', 0) for p in processes])),
-                    'max_process_cpu': float(np.max([p.get('cpu_percent', 0) for p in processes])),
-                    'max_process_memory': float(np.max([p.get('memory_percent', 0) for p in processes]))
+                    'unique_users': len(users),
+                    'avg_process_cpu': float(cpu_sum / len(processes)),
+                    'avg_process_memory': float(mem_sum / len(processes)),
+                    'max_process_cpu': float(cpu_max),
+                    'max_process_memory': float(mem_max)
                 })
         
         # Network metrics
         if 'network' in data:
             net_data = data['network']
             connections = net_data.get('connections', [])
+            established = listening = 0
+            remote_ips = set()
+            for c in connections:
+                status = c.get('status')
+                if status == 'ESTABLISHED':
+                    established += 1
+                elif status == 'LISTEN':
+                    listening += 1
+                raddr = c.get('raddr')
+                if raddr:
+                    remote_ips.add(raddr.get('ip', ''))
             features.update({
                 'total_connections': len(connections),
-                'established_connections': len([c for c in connections if c.get('status') == 'ESTABLISHED']),
-                'listening_ports': len([c for c in connections if c.get('status') == 'LISTEN']),
-                'unique_remote_ips': len(set(c.get('raddr', {}).get('ip', '') for c in connections if c.get('raddr')))
+                'established_connections': established,
+                'listening_ports': listening,
+                'unique_remote_ips': len(remote_ips)
             })
         
         # File system metrics
         if 'file' in data:
             file_data = data['file']
             events = file_data.get('events', [])
+            event_counts = {}
+            for e in events:
+                event_type = e.get('event_type')
+                event_counts[event_type] = event_counts.get(event_type, 0) + 1
             features.update({
                 'file_events_count': len(events),
-                'file_creations': len([e for e in events if e.get('event_type') == 'created']),
-                'file_modifications': len([e for e in events if e.get('event_type') == 'modified']),
-                'file_deletions': len([e for e in events if e.get('event_type') == 'deleted'])
+                'file_creations': event_counts.get('created', 0),
+                'file_modifications': event_counts.get('modified', 0),
+                'file_deletions': event_counts.get('deleted', 0)
             })
         
         # User activity metrics
@@ -159,11 +197,15 @@ class DataPreprocessor:
         if 'container' in data:
             container_data = data['container']
             running_containers = container_data.get('running_containers', [])
+            cpu_sum = mem_sum = 0.0
+            for c in running_containers:
+                cpu_sum += c.get('cpu_percent', 0)
+                mem_sum += c.get('memory_percent', 0)
             features.update({
                 'running_containers': len(running_containers),
                 'total_containers': len(container_data.get('all_containers', [])),
-                'container_cpu_usage': float(np.mean([c.get('cpu_percent', 0) for c in running_containers])) if running_containers else 0.0,
-                'container_memory_usage': float(np.mean([c.get('memory_percent', 0) for c in running_containers])) if running_containers else 0.0
+                'container_cpu_usage': float(cpu_sum / len(running_containers)) if running_containers else 0.0,
+                'container_memory_usage': float(mem_sum / len(running_containers)) if running_containers else 0.0
             })
         
         # Threat intelligence metrics
@@ -182,53 +224,74 @@ class DataPreprocessor:
         """
         Normalize features using appropriate scaling methods.
         """
-        feature_vector = []
-        feature_names = []
-        
-        for name, value in features.items():
-            if isinstance(value, (int, float)) and not np.isnan(value):
-                feature_vector.append(float(value))
-                feature_names.append(name)
-        
-        # Convert to numpy array
-        X = np.array(feature_vector).reshape(1, -1)
-        
-        # Store feature names for later use
-        if not self.feature_names:
-            self.feature_names = feature_names
+        # Every value is numeric by construction (see _FEATURE_DEFAULTS); no per-value checks
+        X = np.fromiter(map(features.__getitem__, FEATURE_ORDER), dtype=np.float64,
+                        count=len(FEATURE_ORDER)).reshape(1, -1)
         
         # Apply scaling if scaler is fitted
-        if 'main_scaler' in self.scalers:
+        params = self._standard_scaling()
+        if params is not None:
+            # X is our own fresh row, so scale it in place
+            X -= params[0]
+            X *= params[1]
+        elif 'main_scaler' in self.scalers:
             X = self.scalers['main_scaler'].transform(X)
         
         return X
     
+    def extract_features_batch(self, data_samples: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Extract the features of many samples into one contiguous (N, D) array,
+        columns in FEATURE_ORDER.
+        """
+        # float64 until scaled: raw values like boot_time lose whole seconds in float32
+        X = np.zeros((len(data_samples), len(FEATURE_ORDER)))
+        now = time.time()
+        for i, sample in enumerate(data_samples):
+            features = self._extract(sample, now)
+            X[i] = [features[name] for name in FEATURE_ORDER]
+        return X
+    
+    def normalize_features_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Scale a whole (N, D) feature matrix in one broadcast operation.
+        Returns a contiguous float32 array, the dtype the detectors score in.
+        """
+        params = self._standard_scaling()
+        if params is not None:
+            X = (X - params[0]) * params[1]
+        elif 'main_scaler' in self.scalers and X.size > 0:
+            X = self.scalers['main_scaler'].transform(X)
+        return np.ascontiguousarray(X, dtype=np.float32)
+    
+    def _standard_scaling(self):
+        """
+        (mean_, 1 / scale_) of a fitted StandardScaler main scaler, cached per scaler
+        object, so scaling is plain array math without transform()'s validation.
+        None for other scalers, which keep going through transform().
+        """
+        scaler = self.scalers.get('main_scaler')
+        if not isinstance(scaler, StandardScaler) or not (scaler.with_mean and scaler.with_std):
+            return None
+        cached = getattr(self, '_scaling_cache', None)
+        if cached is None or cached[0] is not scaler:
+            cached = (scaler, scaler.mean_, 1.0 / scaler.scale_)
+            self._scaling_cache = cached
+        return cached[1], cached[2]
+    
     def fit_scalers(self, data_samples: List[Dict[str, Any]]):
         """
         Fit scalers on historical data samples.
+        Streams FIT_CHUNK_SIZE samples at a time, so memory stays bounded by one chunk.
         """
-        feature_vectors = []
-        
-        for sample in data_samples:
-            features = self.extract_features(sample)
-            feature_vector = []
-            feature_names = []
-            
-            for name, value in features.items():
-                if isinstance(value, (int, float)) and not np.isnan(value):
-                    feature_vector.append(float(value))
-                    feature_names.append(name)
-            
-            if feature_vector:
-                feature_vectors.append(feature_vector)
-                if not self.feature_names:
-                    self.feature_names = feature_names
+        scaler = StandardScaler()
+        for start in range(0, len(data_samples), FIT_CHUNK_SIZE):
+            X = self.extract_features_batch(data_samples[start:start + FIT_CHUNK_SIZE])
+            scaler.partial_fit(X)
         
-        if feature_vectors:
-            X = np.array(feature_vectors)
-            self.scalers['main_scaler'] = StandardScaler()
-            self.scalers['main_scaler'].fit(X)
-            logger.info(f"Fitted scaler on {len(feature_vectors)} samples with {X.shape[1]} features")
+        if len(data_samples) > 0:
+            self.scalers['main_scaler'] = scaler
+            logger.info(f"Fitted scaler on {scaler.n_samples_seen_} samples with {scaler.n_features_in_} features")
     
     def create_sequence_features(self, data_samples: List[Dict[str, Any]], 
                                sequence_length: int = 10) -> np.ndarray:
@@ -238,29 +301,28 @@ class DataPreprocessor:
         if len(data_samples) < sequence_length:
             return np.array([])
         
-        sequences = []
-        for i in range(len(data_samples) - sequence_length + 1):
-            sequence = data_samples[i:i + sequence_length]
-            sequence_features = []
-            
-            for sample in sequence:
-                features = self.extract_features(sample)
-                feature_vector = [float(features.get(name, 0)) for name in self.feature_names]
-                sequence_features.extend(feature_vector)
-            
-            sequences.append(sequence_features)
-        
-        return np.array(sequences)
+        # Extract every sample once, then take the windows as views over the rows
+        X = self.extract_features_batch(data_samples)
+        windows = np.lib.stride_tricks.sliding_window_view(X, (sequence_length, X.shape[1]))[:, 0]
+        # The windows overlap in memory and are read-only; copy them out as independent rows
+        return np.ascontiguousarray(windows.reshape(len(windows), -1))
     
     def extract_text_features(self, text_data: List[str], feature_name: str) -> np.ndarray:
         """
-        Extract features from text data using TF-IDF.
+        Extract features from text data using TF-IDF over hashed n-grams.
+        Returns a sparse CSR matrix.
         """
         if feature_name not in self.tfidf_vectorizers:
-            self.tfidf_vectorizers[feature_name] = TfidfVectorizer(
-                max_features=100,
-                stop_words='english',
-                ngram_range=(1, 2)
+            # Hashing needs no vocabulary, so only the IDF weights are fitted and stored
+            self.tfidf_vectorizers[feature_name] = make_pipeline(
+                HashingVectorizer(
+                    n_features=TEXT_HASH_FEATURES,
+                    alternate_sign=False,
+                    norm=None,
+                    stop_words='english',
+                    ngram_range=(1, 2)
+                ),
+                TfidfTransformer()
             )
             return self.tfidf_vectorizers[feature_name].fit_transform(text_data)
         else:
@@ -278,7 +340,8 @@ class DataPreprocessor:
             'feature_names': self.feature_names,
             'config': self.config
         }
-        joblib.dump(preprocessor_state, filepath)
+        # Protocol 5 (PEP 574) pickles buffers without an extra copy; joblib defaults to 4
+        joblib.dump(preprocessor_state, filepath, protocol=5)
         logger.info(f"Saved preprocessor to {filepath}")
     
     def load_preprocessor(self, filepath: str):
@@ -1,13 +1,23 @@
 import os
 import json
 import shutil
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+MAX_LOADED_MODELS = 8  # deserialized models kept in memory, least recently used evicted first
+
 class ModelManager:
     """
     Manages model lifecycle, versioning, and deployment.
@@ -18,6 +28,9 @@ class ModelManager:
         self.model_dir.mkdir(exist_ok=True)
         self.metadata_file = self.model_dir / "metadata.json"
         self.metadata = self._load_metadata()
+        # model_id -> (filepath, mtime_ns, model)
+        self._loaded: "OrderedDict[str, Any]" = OrderedDict()
+        self._loaded_lock = threading.Lock()
         
     def _load_metadata(self) -> Dict[str, Any]:
         """Load model metadata from file."""
@@ -32,8 +45,13 @@ class ModelManager:
     def _save_metadata(self):
         """Save model metadata to file."""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            # Serialize first and write once; json.dump() issues a write per token
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.metadata, indent=2).encode('utf-8')
+            with open(self.metadata_file, 'wb') as f:
+                f.write(payload)
         except Exception as e:
             logger.error(f"Error saving metadata: {e}")
     
@@ -74,6 +92,7 @@ class ModelManager:
             filepath = self.model_dir / f"{model_id}.joblib"
         
         try:
+            self._evict(model_id)
             if hasattr(model, 'save'):
                 model.save(str(filepath))
             else:
@@ -104,15 +123,34 @@ class ModelManager:
             raise FileNotFoundError(f"Model file not found: {filepath}")
         
         try:
+            # The stat keeps the cache honest if the file is replaced behind our back
+            mtime_ns = os.stat(filepath).st_mtime_ns
+            with self._loaded_lock:
+                cached = self._loaded.get(model_id)
+                if cached is not None and cached[:2] == (filepath, mtime_ns):
+                    self._loaded.move_to_end(model_id)
+                    return cached[2]
+            
             import joblib
             model = joblib.load(filepath)
             logger.info(f"Loaded model {model_id} from {filepath}")
+            
+            with self._loaded_lock:
+                self._loaded[model_id] = (filepath, mtime_ns, model)
+                self._loaded.move_to_end(model_id)
+                while len(self._loaded) > MAX_LOADED_MODELS:
+                    self._loaded.popitem(last=False)
             return model
             
         except Exception as e:
             logger.error(f"Error loading model {model_id}: {e}")
             raise
     
+    def _evict(self, model_id: str):
+        """Drop a model from the in-memory cache."""
+        with self._loaded_lock:
+            self._loaded.pop(model_id, None)
+    
     def deploy_model(self, model_id: str, environment: str = "production"):
         """Deploy a model to a specific environment."""
         if model_id not in self.metadata["models"]:
@@ -148,6 +186,7 @@ class ModelManager:
         
         model_info = self.metadata["models"][model_id]
         filepath = model_info.get("filepath")
+        self._evict(model_id)
         
         # Delete model file
         if filepath and os.path.exists(filepath):
@@ -8,6 +8,12 @@ import json
 from datetime import datetime
 import logging
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 from database import get_db, init_db, check_db_connection, SessionLocal
 from models import Event as EventModel, Agent as AgentModel, Alert as AlertModel
 
@@ -26,6 +32,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+MAX_DECODED_BODY = 64 * 1024 * 1024  # bytes; a zstd body may not inflate past this
+
+async def _plain_response(send, status, text):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": text})
+
+class ZstdRequestMiddleware:
+    """Transparently decode request bodies sent with Content-Encoding: zstd."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (b"content-encoding", b"zstd") not in scope["headers"]:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > MAX_DECODED_BODY:
+                await _plain_response(send, 413, b"request body too large")
+                return
+
+        try:
+            # Stream out at most one byte past the cap instead of inflating the whole frame
+            body = zstandard.ZstdDecompressor().stream_reader(b"".join(chunks)).read(MAX_DECODED_BODY + 1)
+        except zstandard.ZstdError as e:
+            logger.error(f"Invalid zstd request body: {e}")
+            await _plain_response(send, 400, b"invalid zstd body")
+            return
+        if len(body) > MAX_DECODED_BODY:
+            await _plain_response(send, 413, b"decoded request body too large")
+            return
+
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode()))
+        scope = dict(scope, headers=headers)
+
+        async def receive_decoded():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, receive_decoded, send)
+
+if ZSTD_AVAILABLE:
+    app.add_middleware(ZstdRequestMiddleware)
+
 # Pydantic models for API
 class EventCreate(BaseModel):
     agent_id: str
@@ -44,6 +102,9 @@ class EventCreate(BaseModel):
     integrity: Dict[str, Any]
     security_tools: Dict[str, Any]
 
+class EventBatch(BaseModel):
+    batch: List[EventCreate]
+
 class EventResponse(BaseModel):
     id: str
     agent_id: str
@@ -92,50 +153,53 @@ def health():
         "database": db_status
     }
 
+def _ensure_agent(db: Session, event: EventCreate):
+    """Create the agent row on first contact."""
+    agent = db.query(AgentModel).filter(AgentModel.id == event.agent_id).first()
+    if not agent:
+        agent = AgentModel(
+            id=event.agent_id,
+            name=f"Agent-{event.agent_id[:8]}",
+            hostname=event.system.get("hostname", "unknown"),
+            ip_address=event.system.get("ip_address", "unknown"),
+            version="1.0.0"
+        )
+        db.add(agent)
+        db.commit()
+        logger.info(f"Created new agent: {event.agent_id}")
+
+def _build_event_row(event: EventCreate) -> EventModel:
+    return EventModel(
+        agent_id=event.agent_id,
+        timestamp=datetime.fromtimestamp(event.timestamp),
+        event_type="system_scan",
+        cpu_percent=event.system.get("cpu_percent"),
+        memory_percent=event.system.get("memory_percent"),
+        disk_usage_percent=event.system.get("disk_usage_percent"),
+        load_average=event.system.get("load_average"),
+        boot_time=event.system.get("boot_time"),
+        total_processes=len(event.process.get("processes", [])),
+        process_data=event.process,
+        network_connections=event.network.get("connections"),
+        listening_ports=event.network.get("listening_ports"),
+        file_events=event.file.get("events"),
+        logged_in_users=event.user.get("logged_in_users"),
+        user_data=event.user,
+        security_alerts=event.security_tools.get("ids_alerts"),
+        threat_indicators=event.threat_intel.get("indicators"),
+        firewall_rules=event.firewall.get("rules"),
+        container_data=event.container,
+        cloud_metadata=event.cloud,
+        raw_data=event.dict()
+    )
+
 @app.post("/events")
 async def receive_event(event: EventCreate, db: Session = Depends(get_db)):
     """Receive an event from an agent and store it in database."""
     try:
-        # Ensure agent exists
-        agent = db.query(AgentModel).filter(AgentModel.id == event.agent_id).first()
-        if not agent:
-            # Create agent if it doesn't exist
-            agent = AgentModel(
-                id=event.agent_id,
-                name=f"Agent-{event.agent_id[:8]}",
-                hostname=event.system.get("hostname", "unknown"),
-                ip_address=event.system.get("ip_address", "unknown"),
-                version="1.0.0"
-            )
-            db.add(agent)
-            db.commit()
-            logger.info(f"Created new agent: {event.agent_id}")
-        
-        # Create database event
-        db_event = EventModel(
-            agent_id=event.agent_id,
-            timestamp=datetime.fromtimestamp(event.timestamp),
-            event_type="system_scan",
-            cpu_percent=event.system.get("cpu_percent"),
-            memory_percent=event.system.get("memory_percent"),
-            disk_usage_percent=event.system.get("disk_usage_percent"),
-            load_average=event.system.get("load_average"),
-            boot_time=event.system.get("boot_time"),
-            total_processes=len(event.process.get("processes", [])),
-            process_data=event.process,
-            network_connections=event.network.get("connections"),
-            listening_ports=event.network.get("listening_ports"),
-            file_events=event.file.get("events"),
-            logged_in_users=event.user.get("logged_in_users"),
-            user_data=event.user,
-            security_alerts=event.security_tools.get("ids_alerts"),
-            threat_indicators=event.threat_intel.get("indicators"),
-            firewall_rules=event.firewall.get("rules"),
-            container_data=event.container,
-            cloud_metadata=event.cloud,
-            raw_data=event.dict()
-        )
+        _ensure_agent(db, event)
         
+        db_event = _build_event_row(event)
         db.add(db_event)
         db.commit()
         db.refresh(db_event)
@@ -148,6 +212,26 @@ async def receive_event(event: EventCreate, db: Session = Depends(get_db)):
         logger.error(f"Error storing event: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/events/batch")
+async def receive_event_batch(payload: EventBatch, db: Session = Depends(get_db)):
+    """Receive several buffered events from an agent and store them in one transaction."""
+    try:
+        for event in {e.agent_id: e for e in payload.batch}.values():
+            _ensure_agent(db, event)
+        
+        db_events = [_build_event_row(event) for event in payload.batch]
+        db.add_all(db_events)
+        db.commit()
+        
+        event_ids = [e.id for e in db_events]
+        logger.info(f"Batch stored: {len(event_ids)} events")
+        return {"status": "received", "event_ids": event_ids, "timestamp": datetime.utcnow().isoformat()}
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error storing event batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/events", response_model=List[EventResponse])
 async def get_events(
     limit: int = 100, 
@@ -248,44 +332,43 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             event_data = json.loads(data)
             
-            # Store the event in database
+            # A buffered agent sends {"batch": [event, ...]} in one frame
+            is_batch = "batch" in event_data
+            
+            # Store the event(s) in database
             try:
-                # Create a new database session for each event
+                # Create a new database session for each frame
                 db = SessionLocal()
                 try:
-                    event = EventCreate(**event_data)
+                    events = [EventCreate(**e) for e in event_data["batch"]] if is_batch else [EventCreate(**event_data)]
                     
-                    # Ensure agent exists
-                    agent = db.query(AgentModel).filter(AgentModel.id == event.agent_id).first()
-                    if not agent:
-                        # Create agent if it doesn't exist
-                        agent = AgentModel(
-                            id=event.agent_id,
-                            name=f"Agent-{event.agent_id[:8]}",
-                            hostname=event.system.get("hostname", "unknown"),
-                            ip_address=event.system.get("ip_address", "unknown"),
-                            version="1.0.0"
-                        )
-                        db.add(agent)
-                        db.commit()
+                    for agent_event in {e.agent_id: e for e in events}.values():
+                        _ensure_agent(db, agent_event)
                     
-                    db_event = EventModel(
-                        agent_id=event.agent_id,
-                        timestamp=datetime.fromtimestamp(event.timestamp),
-                        event_type="system_scan",
-                        cpu_percent=event.system.get("cpu_percent"),
-                        memory_percent=event.system.get("memory_percent"),
-                        raw_data=event.dict()
-                    )
-                    db.add(db_event)
+                    db_events = [
+                        EventModel(
+                            agent_id=event.agent_id,
+                            timestamp=datetime.fromtimestamp(event.timestamp),
+                            event_type="system_scan",
+                            cpu_percent=event.system.get("cpu_percent"),
+                            memory_percent=event.system.get("memory_percent"),
+                            raw_data=event.dict()
+                        )
+                        for event in events
+                    ]
+                    db.add_all(db_events)
                     db.commit()
                     
                     # Send acknowledgment back to client
-                    await websocket.send_text(json.dumps({
+                    ack = {
                         "status": "received",
                         "timestamp": datetime.utcnow().isoformat(),
-                        "event_id": db_event.id
-                    }))
+                    }
+                    if is_batch:
+                        ack["event_ids"] = [e.id for e in db_events]
+                    else:
+                        ack["event_id"] = db_events[0].id
+                    await websocket.send_text(json.dumps(ack))
                     
                 finally:
                     db.close()